@@ -38,6 +38,7 @@ import logging
 from errors import register_error_handlers
 from auth import init_auth, create_default_admin
 from flask_migrate import Migrate
+from json_provider import OrjsonProvider
 
 
 def configure_logging(app, config_name='development'):
@@ -71,6 +72,9 @@ def create_app(config_name='development'):
     """Application factory pattern"""
     app = Flask(__name__)
 
+    # Serialize JSON responses with orjson
+    app.json = OrjsonProvider(app)
+
     # Load configuration
     app.config.from_object(config[config_name])
 
@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from sqlalchemy.pool import StaticPool
 
 # Load environment variables from .env file
 load_dotenv()
@@ -9,7 +10,21 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'dev-jwt-secret-key-change-in-production'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Room for every distinct statement the API compiles (default is 500)
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'query_cache_size': int(os.environ.get('SQLALCHEMY_QUERY_CACHE_SIZE', 1200))
+    }
+    # Optional read replica for read-only analytics endpoints
+    SQLALCHEMY_BINDS = (
+        {'analytics': os.environ['ANALYTICS_DATABASE_URL']} if os.environ.get('ANALYTICS_DATABASE_URL') else {}
+    )
+    # bcrypt work factor for new password hashes (existing hashes keep theirs)
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000,http://localhost:5173').split(',')
+    # Planning analysis/apply runs allowed at once per process; others wait up
+    # to PLANNING_QUEUE_TIMEOUT seconds for a free slot before getting a 503
+    PLANNING_MAX_CONCURRENCY = int(os.environ.get('PLANNING_MAX_CONCURRENCY', (os.cpu_count() or 1) * 2))
+    PLANNING_QUEUE_TIMEOUT = float(os.environ.get('PLANNING_QUEUE_TIMEOUT', 30))
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -56,7 +71,19 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///test.db'
+    # In-memory database on a single shared connection: no disk I/O, and each
+    # pytest-xdist worker process naturally gets its own database
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        **Config.SQLALCHEMY_ENGINE_OPTIONS,
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False}
+    }
+    # Keep per-statement logging and query recording off in the suite
+    SQLALCHEMY_ECHO = False
+    SQLALCHEMY_RECORD_QUERIES = False
+    # Minimum bcrypt cost: test users don't need slow password hashes
+    BCRYPT_LOG_ROUNDS = 4
     WTF_CSRF_ENABLED = False
 
 # Configuration mapping
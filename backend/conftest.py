@@ -0,0 +1,75 @@
+"""
+Pytest configuration for the HB-Staffing backend.
+
+Pytest puts this file's directory on sys.path, so tests can import the app
+modules (app, models, engine, ...) without adjusting the path themselves.
+
+It also provides the SAVEPOINT isolation shared by the engine and model
+tests: a module opts in with pytest.mark.usefixtures('db_transaction').
+"""
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from models import db
+
+
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+def _begin_transaction(connection):
+    connection.exec_driver_sql('BEGIN')
+
+
+def _enable_savepoints(engine):
+    """Let SQLAlchemy drive SQLite transactions so SAVEPOINTs work on engine."""
+    if event.contains(engine, 'begin', _begin_transaction):
+        return
+    # pysqlite issues its own BEGIN/COMMIT, which breaks SAVEPOINTs;
+    # let SQLAlchemy drive the transaction instead.
+    event.listen(engine, 'connect', _disable_pysqlite_transactions)
+    event.listen(engine, 'begin', _begin_transaction)
+    # The in-memory database lives on the already-open pooled connection
+    with engine.connect() as connection:
+        _disable_pysqlite_transactions(connection.connection.driver_connection, None)
+
+
+@pytest.fixture(scope='module')
+def db_connection(app):
+    """Hold one connection whose transaction is rolled back after the module's tests.
+
+    db.session is bound to it with join_transaction_mode='create_savepoint',
+    so commits made by tests or the code under test only release a
+    SAVEPOINT. Module-scoped fixtures that insert through it are shared by
+    the module's tests while every test starts clean.
+    """
+    _enable_savepoints(db.engine)
+    connection = db.engine.connect()
+    transaction = connection.begin()
+    app_session = db.session
+    db.session = scoped_session(sessionmaker(
+        bind=connection,
+        join_transaction_mode='create_savepoint',
+        expire_on_commit=False,
+        # Fixtures insert through RETURNING and tests commit what they add
+        autoflush=False,
+    ))
+    yield connection
+    db.session.remove()
+    db.session = app_session
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def db_transaction(db_connection):
+    """Roll back whatever a single test writes, keeping module-scoped data."""
+    # Close any session a shared fixture left open so its SAVEPOINT isn't
+    # released underneath this test's
+    db.session.remove()
+    savepoint = db_connection.begin_nested()
+    yield
+    db.session.remove()
+    savepoint.rollback()
@@ -1,4 +1,39 @@
+from contextlib import contextmanager
+
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+
+# Bind key of the optional read replica used by read-only analytics endpoints
+ANALYTICS_BIND = 'analytics'
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the analytics replica inside use_analytics_replica().
+
+    Falls back to the normal bind selection when no analytics bind is
+    configured, and always flushes to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get(ANALYTICS_BIND) and not self._flushing:
+            engine = self._db.engines.get(ANALYTICS_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+# Global SQLAlchemy instance. Objects keep their loaded state after commit so
+# write endpoints can serialize them without re-selecting every attribute.
+db = SQLAlchemy(session_options={"class_": RoutingSession, "expire_on_commit": False})
+
 
-# Global SQLAlchemy instance
-db = SQLAlchemy()
+@contextmanager
+def use_analytics_replica():
+    """Route the current session's reads to the analytics replica within the block"""
+    previous = db.session.info.get(ANALYTICS_BIND, False)
+    db.session.info[ANALYTICS_BIND] = True
+    try:
+        yield
+    finally:
+        db.session.info[ANALYTICS_BIND] = previous
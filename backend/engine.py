@@ -1,5 +1,6 @@
 from datetime import datetime, date, timedelta
 from collections import defaultdict
+from functools import lru_cache
 import json
 
 def get_models_and_db():
@@ -14,6 +15,40 @@ def get_models():
     _, Staff, Project, Assignment = get_models_and_db()
     return Staff, Project, Assignment
 
+@lru_cache(maxsize=4096)
+def _parse_iso_date_string(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return datetime.fromisoformat(value).date()
+
+
+def parse_iso_date(value):
+    """
+    Parse an ISO date string into a date, raising ValueError when invalid.
+
+    Plain YYYY-MM-DD strings use date.fromisoformat directly; full ISO
+    datetimes fall back to datetime.fromisoformat and are truncated. Clients
+    send the same dates over and over, so results are cached.
+    """
+    # Non-strings are unhashable or meaningless to the cached parser
+    if not isinstance(value, str):
+        raise ValueError(value)
+    return _parse_iso_date_string(value)
+
+
+def to_date(value):
+    """Return value as a date, parsing ISO strings and passing other values through"""
+    if not isinstance(value, str):
+        return value
+    return parse_iso_date(value)
+
+
+def month_start_from_key(month_str):
+    """Return the first day of a 'YYYY-MM' month key"""
+    return date.fromisoformat(f"{month_str}-01")
+
+
 def calculate_date_range_overlap(start1, end1, start2, end2):
     """
     Calculate the number of overlapping days between two date ranges.
@@ -411,12 +446,8 @@ def simulate_scenario(project_id, changes):
             staff = db.session.get(Staff, new_assignment['staff_id'])
             if staff:
                 # Parse dates if they're strings
-                sim_start_date = new_assignment['start_date']
-                sim_end_date = new_assignment['end_date']
-                if isinstance(sim_start_date, str):
-                    sim_start_date = datetime.fromisoformat(sim_start_date).date()
-                if isinstance(sim_end_date, str):
-                    sim_end_date = datetime.fromisoformat(sim_end_date).date()
+                sim_start_date = to_date(new_assignment['start_date'])
+                sim_end_date = to_date(new_assignment['end_date'])
 
                 # Get billable rate from project role rates if available
                 role_on_project = new_assignment.get('role_on_project', '')
@@ -445,10 +476,7 @@ def simulate_scenario(project_id, changes):
 
     # Apply date extension if specified
     if changes.get('extend_dates') and changes['extend_dates'].get('end_date'):
-        new_end = changes['extend_dates']['end_date']
-        if isinstance(new_end, str):
-            new_end = datetime.fromisoformat(new_end).date()
-        end_date = new_end
+        end_date = to_date(changes['extend_dates']['end_date'])
 
     # Calculate simulated weekly staffing
     weekly_staffing = defaultdict(float)
@@ -688,8 +716,7 @@ def generate_staff_planning_report(project_id, start_date=None, end_date=None, i
     # Helper function to calculate hours/costs for a month
     def calculate_monthly_data(entry_start, entry_end, hours_per_week, internal_rate, billable_rate, month_str):
         """Calculate hours and costs for a specific month"""
-        month_date = datetime.strptime(month_str, '%Y-%m').date()
-        month_start = date(month_date.year, month_date.month, 1)
+        month_start = month_start_from_key(month_str)
         month_end = month_start + relativedelta(months=1) - timedelta(days=1)
         
         # Calculate overlap
@@ -1163,9 +1190,9 @@ def suggest_staff_for_role(role_id, start_date, end_date, allocation_percentage=
         if allocation_info['assignments']:
             # Find the assignment that ends closest to (but before) the start date
             relevant_end_dates = [
-                datetime.fromisoformat(a['end_date']).date() 
-                for a in allocation_info['assignments']
-                if datetime.fromisoformat(a['end_date']).date() <= start_date
+                assignment_end
+                for assignment_end in (to_date(a['end_date']) for a in allocation_info['assignments'])
+                if assignment_end <= start_date
             ]
             
             if relevant_end_dates:
@@ -1544,10 +1571,8 @@ def validate_assignment_allocation(staff_id, new_start_date, new_end_date, new_a
         raise ValueError("Staff member not found")
     
     # Parse dates if strings
-    if isinstance(new_start_date, str):
-        new_start_date = datetime.fromisoformat(new_start_date).date()
-    if isinstance(new_end_date, str):
-        new_end_date = datetime.fromisoformat(new_end_date).date()
+    new_start_date = to_date(new_start_date)
+    new_end_date = to_date(new_end_date)
     
     # Get existing assignments for this staff member that overlap with the new period
     query = Assignment.query.filter(
@@ -1781,8 +1806,7 @@ def generate_coverage_analysis(exercise_id):
                 continue
             
             for month_str in months:
-                month_date = datetime.strptime(month_str, '%Y-%m').date()
-                month_start = date(month_date.year, month_date.month, 1)
+                month_start = month_start_from_key(month_str)
                 month_end = month_start + relativedelta(months=1) - timedelta(days=1)
                 
                 # Check if role overlaps with this month
@@ -1892,8 +1916,7 @@ def calculate_minimum_staff_per_role(exercise_id, overlap_mode='efficient'):
         if role_id and peak_month:
             try:
                 # Parse peak month to get date range
-                peak_date = datetime.strptime(peak_month, '%Y-%m').date()
-                peak_start = date(peak_date.year, peak_date.month, 1)
+                peak_start = month_start_from_key(peak_month)
                 peak_end = peak_start + relativedelta(months=1) - timedelta(days=1)
                 
                 suggestion_result = suggest_staff_for_role(
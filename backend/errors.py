@@ -4,6 +4,7 @@ Custom error classes and error handling utilities for HB-Staffing API
 
 from flask import jsonify, current_app
 import logging
+from db import db
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -64,6 +65,13 @@ class BusinessLogicError(HBStaffingError):
         super().__init__(message, 422)  # Unprocessable Entity
 
 
+class ServiceUnavailableError(HBStaffingError):
+    """Raised when the server is too busy to handle a request"""
+
+    def __init__(self, message="Service temporarily unavailable"):
+        super().__init__(message, 503)
+
+
 def register_error_handlers(app):
     """Register error handlers with the Flask app"""
 
@@ -154,13 +162,14 @@ def register_error_handlers(app):
         }), 500
 
 
+def _is_blank(value):
+    """Return True for a missing, None or whitespace-only value"""
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
 def validate_required(data, fields):
     """Validate that required fields are present in data"""
-    missing = []
-    for field in fields:
-        if field not in data or data[field] is None or (isinstance(data[field], str) and data[field].strip() == ''):
-            missing.append(field)
-
+    missing = [field for field in fields if _is_blank(data.get(field))]
     if missing:
         raise ValidationError(f"Missing required fields: {', '.join(missing)}")
 
@@ -188,12 +197,14 @@ def validate_enum(value, allowed_values, field_name):
         raise ValidationError(f"{field_name} must be one of: {', '.join(allowed_values)}")
 
 
-def safe_db_operation(operation_func, error_message="Database operation failed"):
+def safe_db_operation(operation_func, error_message="Database operation failed", args=()):
     """Safely execute database operations with error handling"""
     try:
-        return operation_func()
+        return operation_func(*args)
     except Exception as e:
         logger.error(f"Database operation failed: {str(e)}")
+        # Leave the session usable for the rest of the request
+        db.session.rollback()
         raise HBStaffingError(error_message) from e
 
 
@@ -0,0 +1,49 @@
+"""
+JSON provider backed by orjson.
+
+Produces the same output as Flask's default provider (sorted keys, HTTP
+dates for date objects, custom types via the default hook) while doing the
+encoding in orjson.
+"""
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes and parses with orjson"""
+
+    def _dumps_bytes(self, obj, sort_keys, indent, default, option=0):
+        """Serialize obj to JSON bytes"""
+        # Dates are passed through to the default hook so they keep Flask's format
+        option |= orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string"""
+        return self._dumps_bytes(
+            obj,
+            kwargs.get('sort_keys', self.sort_keys),
+            kwargs.get('indent'),
+            kwargs.get('default', self.default)
+        ).decode()
+
+    def response(self, *args, **kwargs):
+        """
+        Serialize the given arguments as a JSON response.
+
+        Same output as the default provider, but orjson's bytes go straight
+        into the response instead of being decoded to str and encoded again.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = self._dumps_bytes(obj, self.sort_keys, indent, self.default, orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+    def loads(self, s, **kwargs):
+        """Deserialize JSON from a string or bytes"""
+        return orjson.loads(s)
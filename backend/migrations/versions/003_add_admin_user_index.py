@@ -0,0 +1,33 @@
+"""Add partial index on admin users
+
+Revision ID: 003_admin_user_index
+Revises: 002_planning_exercises
+Create Date: 2026-10-16
+
+This migration adds:
+- ix_users_admin partial index on users(id) WHERE role = 'admin', used when
+  checking for remaining admins before deleting a user
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003_admin_user_index'
+down_revision = '002_planning_exercises'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_users_admin',
+        'users',
+        ['id'],
+        postgresql_where=sa.text("role = 'admin'"),
+        sqlite_where=sa.text("role = 'admin'")
+    )
+
+
+def downgrade():
+    op.drop_index('ix_users_admin', table_name='users')
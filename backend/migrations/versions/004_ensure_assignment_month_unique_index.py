@@ -0,0 +1,37 @@
+"""Ensure unique index on monthly allocation (assignment_id, month)
+
+Revision ID: 004_assignment_month_index
+Revises: 003_admin_user_index
+Create Date: 2026-10-16
+
+This migration adds:
+- unique_assignment_month unique index on assignment_monthly_allocations
+  (assignment_id, month) for databases created before the model declared it.
+  Month lookups and the ON CONFLICT upsert of monthly allocations rely on it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004_assignment_month_index'
+down_revision = '003_admin_user_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables created by create_all already have this as a unique constraint
+    op.create_index(
+        'unique_assignment_month',
+        'assignment_monthly_allocations',
+        ['assignment_id', 'month'],
+        unique=True,
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    # The index is part of the model's schema (UniqueConstraint on
+    # AssignmentMonthlyAllocation), so it is left in place
+    pass
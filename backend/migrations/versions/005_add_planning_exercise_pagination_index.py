@@ -0,0 +1,30 @@
+"""Add index for planning exercise list pagination
+
+Revision ID: 005_exercise_page_index
+Revises: 004_assignment_month_index
+Create Date: 2026-10-17
+
+This migration adds:
+- ix_planning_exercises_updated_at_id index on planning_exercises(updated_at, id),
+  used for newest-first keyset pagination of the exercise list
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '005_exercise_page_index'
+down_revision = '004_assignment_month_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_planning_exercises_updated_at_id',
+        'planning_exercises',
+        ['updated_at', 'id']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_planning_exercises_updated_at_id', table_name='planning_exercises')
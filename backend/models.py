@@ -1,5 +1,8 @@
 from datetime import datetime, timezone
 from db import db
+from flask import current_app, has_app_context
+from sqlalchemy import inspect as sa_inspect, select
+from sqlalchemy.types import Date, DateTime
 import json
 import bcrypt
 
@@ -9,6 +12,64 @@ def utc_now():
     return datetime.now(timezone.utc)
 
 
+# Generated column serializers, keyed by (model class, excluded attribute names)
+_column_serializers = {}
+
+
+def build_column_serializer(model_cls, exclude=()):
+    """
+    Generate a function that converts a model's column attributes to a dict.
+
+    The function body is generated from the mapped columns and compiled once,
+    so serializing a row is a single dict literal with no per-column
+    introspection. Date and DateTime columns are rendered with isoformat().
+    DateTime columns hold naive UTC values, so the tzinfo of values set in
+    memory (utc_now) is dropped to match what is read back from the database.
+    """
+    lines = ['def serialize(obj):', '    return {']
+    for attr in sa_inspect(model_cls).column_attrs:
+        if attr.key in exclude:
+            continue
+        column_type = attr.columns[0].type
+        if isinstance(column_type, DateTime):
+            lines.append(f"        {attr.key!r}: obj.{attr.key}.replace(tzinfo=None).isoformat() if obj.{attr.key} else None,")
+        elif isinstance(column_type, Date):
+            lines.append(f"        {attr.key!r}: obj.{attr.key}.isoformat() if obj.{attr.key} else None,")
+        else:
+            lines.append(f"        {attr.key!r}: obj.{attr.key},")
+    lines.append('    }')
+
+    namespace = {}
+    exec(compile('\n'.join(lines), f'<{model_cls.__name__} column serializer>', 'exec'), namespace)
+    return namespace['serialize']
+
+
+def get_column_serializer(model_cls, exclude=()):
+    """Return the cached generated serializer for a model class"""
+    key = (model_cls, exclude)
+    serializer = _column_serializers.get(key)
+    if serializer is None:
+        serializer = _column_serializers[key] = build_column_serializer(model_cls, exclude)
+    return serializer
+
+
+def serialize_columns(obj, exclude=()):
+    """Serialize an instance's columns using the cached generated serializer for its class"""
+    return get_column_serializer(type(obj), exclude)(obj)
+
+
+def column_projection(model_cls, exclude=()):
+    """
+    Return the column attributes serialize_columns covers, for use in select().
+
+    Rows selected this way can be passed to get_column_serializer(model_cls,
+    exclude) directly, producing the same dicts as to_dict without building
+    ORM instances.
+    """
+    return [getattr(model_cls, attr.key) for attr in sa_inspect(model_cls).column_attrs
+            if attr.key not in exclude]
+
+
 class Role(db.Model):
     """Role/Position Title model with associated hourly costs"""
     __tablename__ = 'roles'
@@ -34,17 +95,9 @@ class Role(db.Model):
 
     def to_dict(self):
         """Convert role to dictionary"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'hourly_cost': self.hourly_cost,
-            'default_billable_rate': self.default_billable_rate,
-            'is_active': self.is_active,
-            'staff_count': len(self.staff_members) if self.staff_members else 0,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        data = serialize_columns(self)
+        data['staff_count'] = len(self.staff_members) if self.staff_members else 0
+        return data
 
     @staticmethod
     def get_by_name(name):
@@ -89,20 +142,13 @@ class Staff(db.Model):
 
     def to_dict(self):
         """Convert staff member to dictionary"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'role_id': self.role_id,
-            'role': self.position_role.name if self.position_role else None,
-            'role_hourly_cost': self.position_role.hourly_cost if self.position_role else None,
-            'internal_hourly_cost': self.internal_hourly_cost,
-            'default_billable_rate': self.default_billable_rate,
-            'availability_start': self.availability_start.isoformat() if self.availability_start else None,
-            'availability_end': self.availability_end.isoformat() if self.availability_end else None,
-            'skills': json.loads(self.skills) if self.skills else [],
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        data = serialize_columns(self, exclude=('skills',))
+        position_role = self.position_role
+        data['role'] = position_role.name if position_role else None
+        data['role_hourly_cost'] = position_role.hourly_cost if position_role else None
+        data['default_billable_rate'] = position_role.default_billable_rate if position_role else None
+        data['skills'] = json.loads(self.skills) if self.skills else []
+        return data
 
     def get_skills_list(self):
         """Get skills as a list"""
@@ -153,25 +199,25 @@ class Project(db.Model):
 
     def to_dict(self, include_children=False):
         """Convert project to dictionary"""
-        data = {
-            'id': self.id,
-            'name': self.name,
-            'start_date': self.start_date.isoformat() if self.start_date else None,
-            'end_date': self.end_date.isoformat() if self.end_date else None,
-            'status': self.status,
-            'budget': self.budget,
-            'location': self.location,
-            'parent_project_id': self.parent_project_id,
-            'is_folder': self.is_folder,
-            'parent_project_name': self.parent_project.name if self.parent_project else None,
-            'sub_projects_count': len(self.sub_projects) if self.sub_projects else 0,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        data = self.to_summary_dict(
+            parent_project_name=self.parent_project.name if self.parent_project else None,
+            sub_projects_count=len(self.sub_projects) if self.sub_projects else 0
+        )
         if include_children and self.sub_projects:
             data['sub_projects'] = [sp.to_dict(include_children=False) for sp in self.sub_projects]
         return data
 
+    def to_summary_dict(self, parent_project_name, sub_projects_count):
+        """
+        Convert project to dictionary using precomputed hierarchy fields.
+        Lets callers that already hold the project tree avoid lazy-loading
+        parent_project and sub_projects for every row.
+        """
+        data = serialize_columns(self)
+        data['parent_project_name'] = parent_project_name
+        data['sub_projects_count'] = sub_projects_count
+        return data
+
     @property
     def duration_days(self):
         """Calculate project duration in days"""
@@ -233,16 +279,40 @@ class Project(db.Model):
             list of dicts with role info and rates
         """
         all_roles = Role.query.filter_by(is_active=True).all()
+
+        # Resolve the ancestor chain (this project first) with one recursive query
+        chain = select(Project.id, Project.parent_project_id).where(Project.id == self.id).cte(
+            'project_ancestors', recursive=True)
+        chain = chain.union(
+            select(Project.id, Project.parent_project_id).where(Project.id == chain.c.parent_project_id))
+        parent_by_id = dict(db.session.execute(select(chain.c.id, chain.c.parent_project_id)).all())
+
+        ancestor_ids = []
+        project_id = self.id
+        while project_id is not None and project_id in parent_by_id and project_id not in ancestor_ids:
+            ancestor_ids.append(project_id)
+            project_id = parent_by_id[project_id]
+
+        # Load the explicit rates of every project in the chain at once
+        rates_by_project = {project_id: {} for project_id in ancestor_ids}
+        for project_id, role_id, billable_rate in db.session.query(
+                ProjectRoleRate.project_id, ProjectRoleRate.role_id, ProjectRoleRate.billable_rate
+        ).filter(ProjectRoleRate.project_id.in_(ancestor_ids)):
+            rates_by_project[project_id][role_id] = billable_rate
+
         rates = []
-        
         for role in all_roles:
-            rate_info = self.get_role_rate(role.id)
+            # Nearest project in the chain with an explicit rate wins
+            source_project_id = next(
+                (project_id for project_id in ancestor_ids if role.id in rates_by_project[project_id]),
+                None
+            )
             rates.append({
                 'role_id': role.id,
                 'role_name': role.name,
-                'billable_rate': rate_info['rate'] if rate_info else None,
-                'is_inherited': rate_info['is_inherited'] if rate_info else None,
-                'source_project_id': rate_info['source_project_id'] if rate_info else None
+                'billable_rate': rates_by_project[source_project_id][role.id] if source_project_id else None,
+                'is_inherited': source_project_id != self.id if source_project_id else None,
+                'source_project_id': source_project_id
             })
         
         return rates
@@ -272,15 +342,9 @@ class ProjectRoleRate(db.Model):
 
     def to_dict(self):
         """Convert project role rate to dictionary"""
-        return {
-            'id': self.id,
-            'project_id': self.project_id,
-            'role_id': self.role_id,
-            'role_name': self.role.name if self.role else None,
-            'billable_rate': self.billable_rate,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        data = serialize_columns(self)
+        data['role_name'] = self.role.name if self.role else None
+        return data
 
 
 class Assignment(db.Model):
@@ -334,21 +398,9 @@ class Assignment(db.Model):
     def to_dict(self, include_monthly_allocations=False):
         """Convert assignment to dictionary"""
         billable_rate_info = self.get_effective_billable_rate()
-        data = {
-            'id': self.id,
-            'staff_id': self.staff_id,
-            'project_id': self.project_id,
-            'start_date': self.start_date.isoformat() if self.start_date else None,
-            'end_date': self.end_date.isoformat() if self.end_date else None,
-            'hours_per_week': self.hours_per_week,
-            'role_on_project': self.role_on_project,
-            # Allocation fields
-            'allocation_type': self.allocation_type,
-            'allocation_percentage': self.allocation_percentage,
+        data = serialize_columns(self)
+        data.update({
             'effective_allocation': self.effective_allocation,
-            'allow_over_allocation': self.allow_over_allocation,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             # Include related data
             'staff_name': self.staff_member.name if self.staff_member else None,
             'project_name': self.project.name if self.project else None,
@@ -362,7 +414,7 @@ class Assignment(db.Model):
             # Allocated costs (after applying allocation percentage)
             'allocated_estimated_cost': self.allocated_estimated_cost,
             'allocated_internal_cost': self.allocated_internal_cost
-        }
+        })
         
         if include_monthly_allocations and self.allocation_type == self.ALLOCATION_PERCENTAGE_MONTHLY:
             data['monthly_allocations'] = [ma.to_dict() for ma in self.monthly_allocations]
@@ -550,19 +602,18 @@ class AssignmentMonthlyAllocation(db.Model):
 
     def to_dict(self):
         """Convert monthly allocation to dictionary"""
-        return {
-            'id': self.id,
-            'assignment_id': self.assignment_id,
-            'month': self.month.isoformat() if self.month else None,
-            'allocation_percentage': self.allocation_percentage,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        return serialize_columns(self)
 
 
 class User(db.Model):
     """User model for authentication and authorization"""
     __tablename__ = 'users'
+    __table_args__ = (
+        # Partial index for the remaining-admin check in delete_user
+        db.Index('ix_users_admin', 'id',
+                 postgresql_where=db.text("role = 'admin'"),
+                 sqlite_where=db.text("role = 'admin'")),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(50), unique=True, nullable=False)
@@ -581,25 +632,20 @@ class User(db.Model):
         self.set_password(password)
 
     def set_password(self, password):
-        """Hash and set the password"""
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        """Hash and set the password using the app's BCRYPT_LOG_ROUNDS work factor"""
+        rounds = current_app.config.get('BCRYPT_LOG_ROUNDS', 12) if has_app_context() else 12
+        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
 
     def check_password(self, password):
         """Verify the password"""
         return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
 
+    # Columns never included in serialized users
+    SENSITIVE_COLUMNS = ('password_hash',)
+
     def to_dict(self, include_sensitive=False):
         """Convert user to dictionary"""
-        data = {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'role': self.role,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None
-        }
+        data = serialize_columns(self, exclude=self.SENSITIVE_COLUMNS)
         if include_sensitive:
             data['password_hash'] = self.password_hash
         return data
@@ -653,17 +699,8 @@ class ProjectTemplate(db.Model):
 
     def to_dict(self, include_roles=True):
         """Convert template to dictionary"""
-        data = {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'project_type': self.project_type,
-            'duration_months': self.duration_months,
-            'is_active': self.is_active,
-            'role_count': len(self.template_roles) if self.template_roles else 0,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        data = serialize_columns(self)
+        data['role_count'] = len(self.template_roles) if self.template_roles else 0
         if include_roles and self.template_roles:
             data['roles'] = [tr.to_dict() for tr in self.template_roles]
         return data
@@ -696,20 +733,14 @@ class TemplateRole(db.Model):
 
     def to_dict(self):
         """Convert template role to dictionary"""
-        return {
-            'id': self.id,
-            'template_id': self.template_id,
-            'role_id': self.role_id,
-            'role_name': self.role.name if self.role else None,
-            'role_hourly_cost': self.role.hourly_cost if self.role else None,
-            'role_default_billable_rate': self.role.default_billable_rate if self.role else None,
-            'count': self.count,
-            'start_month': self.start_month,
-            'end_month': self.end_month,
-            'hours_per_week': self.hours_per_week,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        role = self.role
+        data = serialize_columns(self)
+        data.update({
+            'role_name': role.name if role else None,
+            'role_hourly_cost': role.hourly_cost if role else None,
+            'role_default_billable_rate': role.default_billable_rate if role else None
+        })
+        return data
 
 
 class GhostStaff(db.Model):
@@ -773,28 +804,18 @@ class GhostStaff(db.Model):
 
     def to_dict(self):
         """Convert ghost staff to dictionary"""
-        return {
-            'id': self.id,
-            'project_id': self.project_id,
+        data = serialize_columns(self)
+        data.update({
             'project_name': self.project.name if self.project else None,
-            'role_id': self.role_id,
             'role_name': self.role.name if self.role else None,
-            'name': self.name,
-            'internal_hourly_cost': self.internal_hourly_cost,
-            'billable_rate': self.billable_rate,
-            'start_date': self.start_date.isoformat() if self.start_date else None,
-            'end_date': self.end_date.isoformat() if self.end_date else None,
-            'hours_per_week': self.hours_per_week,
             'duration_weeks': self.duration_weeks,
             'total_hours': self.total_hours,
             'estimated_cost': self.estimated_cost,
             'internal_cost': self.internal_cost,
             'is_replaced': self.is_replaced,
-            'replaced_by_staff_id': self.replaced_by_staff_id,
-            'replaced_by_staff_name': self.replaced_by.name if self.replaced_by else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+            'replaced_by_staff_name': self.replaced_by.name if self.replaced_by else None
+        })
+        return data
 
 
 # =============================================================================
@@ -804,6 +825,10 @@ class GhostStaff(db.Model):
 class PlanningExercise(db.Model):
     """Multi-project planning exercise for staffing analysis"""
     __tablename__ = 'planning_exercises'
+    __table_args__ = (
+        # Serves the newest-first keyset pagination of the exercise list
+        db.Index('ix_planning_exercises_updated_at_id', 'updated_at', 'id'),
+    )
     
     # Status constants
     STATUS_DRAFT = 'draft'
@@ -833,17 +858,11 @@ class PlanningExercise(db.Model):
     
     def to_dict(self, include_projects=True):
         """Convert planning exercise to dictionary"""
-        data = {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'status': self.status,
-            'created_by': self.created_by,
+        data = serialize_columns(self)
+        data.update({
             'creator_name': self.creator.username if self.creator else None,
-            'project_count': len(self.planning_projects) if self.planning_projects else 0,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+            'project_count': len(self.planning_projects) if self.planning_projects else 0
+        })
         
         if include_projects and self.planning_projects:
             data['projects'] = [p.to_dict(include_roles=True) for p in self.planning_projects]
@@ -909,19 +928,12 @@ class PlanningProject(db.Model):
     
     def to_dict(self, include_roles=True):
         """Convert planning project to dictionary"""
-        data = {
-            'id': self.id,
-            'exercise_id': self.exercise_id,
-            'name': self.name,
-            'start_date': self.start_date.isoformat() if self.start_date else None,
-            'duration_months': self.duration_months,
-            'end_date': self.calculated_end_date.isoformat() if self.calculated_end_date else None,
-            'location': self.location,
-            'budget': self.budget,
-            'role_count': len(self.planning_roles) if self.planning_roles else 0,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        end_date = self.calculated_end_date
+        data = serialize_columns(self)
+        data.update({
+            'end_date': end_date.isoformat() if end_date else None,
+            'role_count': len(self.planning_roles) if self.planning_roles else 0
+        })
         
         if include_roles and self.planning_roles:
             data['roles'] = [r.to_dict() for r in self.planning_roles]
@@ -929,6 +941,15 @@ class PlanningProject(db.Model):
         return data
 
 
+def _months_between(start_date, end_date):
+    """Return the whole months from start_date to end_date, or 0 if either is missing"""
+    if start_date and end_date:
+        from dateutil.relativedelta import relativedelta
+        delta = relativedelta(end_date, start_date)
+        return delta.years * 12 + delta.months
+    return 0
+
+
 class PlanningRole(db.Model):
     """Role requirement within a planning project"""
     __tablename__ = 'planning_roles'
@@ -985,30 +1006,22 @@ class PlanningRole(db.Model):
     @property
     def duration_months(self):
         """Calculate duration in months"""
-        if self.calculated_start_date and self.calculated_end_date:
-            from dateutil.relativedelta import relativedelta
-            delta = relativedelta(self.calculated_end_date, self.calculated_start_date)
-            return delta.years * 12 + delta.months
-        return 0
+        return _months_between(self.calculated_start_date, self.calculated_end_date)
     
     def to_dict(self):
         """Convert planning role to dictionary"""
-        return {
-            'id': self.id,
-            'planning_project_id': self.planning_project_id,
-            'role_id': self.role_id,
-            'role_name': self.role.name if self.role else None,
-            'role_hourly_cost': self.role.hourly_cost if self.role else None,
-            'role_default_billable_rate': self.role.default_billable_rate if self.role else None,
-            'count': self.count,
-            'start_month_offset': self.start_month_offset,
-            'end_month_offset': self.end_month_offset,
-            'allocation_percentage': self.allocation_percentage,
-            'hours_per_week': self.hours_per_week,
-            'overlap_mode': self.overlap_mode,
-            'calculated_start_date': self.calculated_start_date.isoformat() if self.calculated_start_date else None,
-            'calculated_end_date': self.calculated_end_date.isoformat() if self.calculated_end_date else None,
-            'duration_months': self.duration_months,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        role = self.role
+        # Each calculated date walks relativedelta arithmetic, so compute them once
+        start_date = self.calculated_start_date
+        end_date = self.calculated_end_date
+
+        data = serialize_columns(self)
+        data.update({
+            'role_name': role.name if role else None,
+            'role_hourly_cost': role.hourly_cost if role else None,
+            'role_default_billable_rate': role.default_billable_rate if role else None,
+            'calculated_start_date': start_date.isoformat() if start_date else None,
+            'calculated_end_date': end_date.isoformat() if end_date else None,
+            'duration_months': _months_between(start_date, end_date)
+        })
+        return data
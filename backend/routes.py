@@ -1,11 +1,30 @@
-from flask import Blueprint, request, jsonify, current_app
-from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
+import base64
+from datetime import datetime, date
+import hashlib
 import json
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+import threading
+from sqlalchemy import delete, exists, func, insert, or_, select, tuple_
+from sqlalchemy.orm import joinedload, selectinload
+from db import db, use_analytics_replica
 from errors import (
-    ValidationError, NotFoundError, ConflictError,
+    ValidationError, NotFoundError, ConflictError, ServiceUnavailableError,
     validate_required, validate_date_range, validate_positive_number, validate_enum,
     safe_db_operation, log_api_request, log_api_response
 )
+from engine import (
+    calculate_project_staffing_needs, calculate_organization_forecast,
+    simulate_scenario, calculate_project_cost, detect_staffing_gaps,
+    calculate_capacity_analysis, generate_staff_planning_report,
+    get_staff_availability_forecast, suggest_staff_for_role,
+    flag_new_hire_needs, detect_over_allocations,
+    get_staff_allocation_timeline as get_timeline,
+    get_organization_over_allocations, validate_assignment_allocation,
+    generate_coverage_analysis, calculate_minimum_staff_per_role,
+    calculate_planning_costs, apply_planning_exercise, parse_iso_date
+)
 from auth import (
     login_user, refresh_access_token, register_user,
     require_role, require_permission, optional_auth, get_current_user
@@ -13,25 +32,91 @@ from auth import (
 
 api = Blueprint('api', __name__)
 
+# Allowed project statuses (a tuple keeps the order used in error messages)
+PROJECT_STATUSES = ('planning', 'active', 'completed', 'cancelled', 'on-hold')
+
+# Allowed assignment allocation types and their error message, built on first use
+# because the models are imported lazily
+_allocation_type_validation = None
+
+
+def get_allocation_type_validation():
+    """Return the allowed allocation types as a frozenset with a pre-joined error message"""
+    global _allocation_type_validation
+    if _allocation_type_validation is None:
+        from models import Assignment
+        _allocation_type_validation = (
+            frozenset(Assignment.ALLOCATION_TYPES),
+            f"Invalid allocation_type. Must be one of: {', '.join(Assignment.ALLOCATION_TYPES)}"
+        )
+    return _allocation_type_validation
+
+
+# Allowed planning exercise statuses and planning role overlap modes with their
+# error messages, built on first use like the allocation types above
+_planning_status_validation = None
+_overlap_mode_validation = None
+
+
+def get_planning_status_validation():
+    """Return the allowed planning exercise statuses as a frozenset with a pre-joined error message"""
+    global _planning_status_validation
+    if _planning_status_validation is None:
+        from models import PlanningExercise
+        _planning_status_validation = (
+            frozenset(PlanningExercise.STATUSES),
+            f"Invalid status. Must be one of: {', '.join(PlanningExercise.STATUSES)}"
+        )
+    return _planning_status_validation
+
+
+def get_overlap_mode_validation():
+    """Return the allowed planning role overlap modes as a frozenset with a pre-joined error message"""
+    global _overlap_mode_validation
+    if _overlap_mode_validation is None:
+        from models import PlanningRole
+        _overlap_mode_validation = (
+            frozenset(PlanningRole.OVERLAP_MODES),
+            f"Invalid overlap_mode. Must be one of: {', '.join(PlanningRole.OVERLAP_MODES)}"
+        )
+    return _overlap_mode_validation
+
+# Model tuples resolved on first use and reused for every later request
+_models = None
+_role_model = None
+_project_models = None
+_template_models = None
+_planning_models = None
+
+
 def get_models():
     """Import models and db - call this inside route functions"""
-    from db import db
-    from models import Staff, Project, Assignment, Role, ProjectRoleRate, AssignmentMonthlyAllocation
-    return db, Staff, Project, Assignment, Role, ProjectRoleRate, AssignmentMonthlyAllocation
+    global _models
+    if _models is None:
+        from db import db
+        from models import Staff, Project, Assignment, Role, ProjectRoleRate, AssignmentMonthlyAllocation
+        _models = (db, Staff, Project, Assignment, Role, ProjectRoleRate, AssignmentMonthlyAllocation)
+    return _models
 
 
 def get_role_model():
     """Import Role model - for role-specific endpoints"""
-    from db import db
-    from models import Role
-    return db, Role
+    global _role_model
+    if _role_model is None:
+        from db import db
+        from models import Role
+        _role_model = (db, Role)
+    return _role_model
 
 
 def get_project_models():
     """Import Project and related models - for project-specific endpoints"""
-    from db import db
-    from models import Project, ProjectRoleRate, Role
-    return db, Project, ProjectRoleRate, Role
+    global _project_models
+    if _project_models is None:
+        from db import db
+        from models import Project, ProjectRoleRate, Role
+        _project_models = (db, Project, ProjectRoleRate, Role)
+    return _project_models
 
 # Error handling decorator
 def handle_errors(f):
@@ -48,10 +133,317 @@ def handle_errors(f):
     wrapper.__name__ = f.__name__
     return wrapper
 
+# Read-only analysis responses cached per worker process, keyed on the
+# endpoint, its arguments and the version of the data it is computed from
+RESPONSE_CACHE_SIZE = 128
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
+def data_version(*models):
+    """
+    Return a version tuple for the given models' tables.
+
+    Combines the row count and latest updated_at of each table in one query,
+    so any insert, update or delete produces a new version.
+    """
+    db = get_models()[0]
+    columns = []
+    for model in models:
+        columns.append(select(func.count()).select_from(model).scalar_subquery())
+        columns.append(select(func.max(model.updated_at)).scalar_subquery())
+    return tuple(db.session.execute(select(*columns)).one())
+
+
+def forecast_data_version(**kwargs):
+    """Return a version tuple for the data forecasts are computed from"""
+    return data_version(*get_models()[1:])
+
+
+def staffing_data_version(**kwargs):
+    """Return a version tuple for the staff and allocation data availability reads use"""
+    db, Staff, Project, Assignment, Role, ProjectRoleRate, AssignmentMonthlyAllocation = get_models()
+    return data_version(Staff, Project, Assignment, Role, AssignmentMonthlyAllocation)
+
+
+def exercise_data_version(*criteria):
+    """
+    Return a version tuple for the planning exercises matching criteria.
+
+    Covers only those exercises, their projects and roles, the role
+    definitions they reference (names and rates) and their creators (whose
+    usernames are serialized as creator_name), so writes to other exercises
+    or unrelated tables leave the version unchanged.
+    """
+    from models import User
+    db, PlanningExercise, PlanningProject, PlanningRole, Role = get_planning_models()
+    exercises = select(PlanningExercise.id).where(*criteria).scalar_subquery()
+    projects = select(PlanningProject.id).where(PlanningProject.exercise_id.in_(exercises)).scalar_subquery()
+    in_projects = PlanningRole.planning_project_id.in_(projects)
+    columns = [
+        select(func.count()).select_from(PlanningExercise).where(*criteria),
+        select(func.max(PlanningExercise.updated_at)).where(*criteria),
+        select(func.count()).select_from(PlanningProject).where(PlanningProject.exercise_id.in_(exercises)),
+        select(func.max(PlanningProject.updated_at)).where(PlanningProject.exercise_id.in_(exercises)),
+        select(func.count()).select_from(PlanningRole).where(in_projects),
+        select(func.max(PlanningRole.updated_at)).where(in_projects),
+        select(func.max(Role.updated_at)).where(Role.id.in_(select(PlanningRole.role_id).where(in_projects))),
+        select(func.max(User.updated_at)).where(User.id.in_(select(PlanningExercise.created_by).where(*criteria))),
+    ]
+    return tuple(db.session.execute(select(*(column.scalar_subquery() for column in columns))).one())
+
+
+def planning_exercise_version(exercise_id, **kwargs):
+    """Return a version tuple for a single planning exercise"""
+    PlanningExercise = get_planning_models()[1]
+    return exercise_data_version(PlanningExercise.id == exercise_id)
+
+
+def planning_exercise_list_version(**kwargs):
+    """
+    Return a version tuple for the filtered planning exercise list.
+
+    Paginated requests return None so they skip the cache: each page is a
+    bounded index scan, cheaper than versioning the whole filtered set.
+    """
+    if 'limit' in request.args or 'cursor' in request.args:
+        return None
+    PlanningExercise = get_planning_models()[1]
+    status = request.args.get('status')
+    return exercise_data_version(*([PlanningExercise.status == status] if status else []))
+
+
+def planning_analysis_version(exercise_id, **kwargs):
+    """
+    Return a version tuple for an exercise plus the staff data its analysis is checked against.
+
+    Staff suggestions read assignments' monthly allocations, so this covers
+    the full forecast model set rather than just staff and assignments.
+    """
+    return planning_exercise_version(exercise_id) + forecast_data_version()
+
+
+def cached_response(version):
+    """
+    Decorator factory caching successful JSON responses of read-only endpoints.
+
+    version(**route_kwargs) returns the version of the data the response is
+    computed from, or None to bypass the cache for that request. Entries are
+    reused until the version changes or the day rolls over (several endpoints
+    default their ranges to today). Responses carry an ETag so clients can
+    revalidate with If-None-Match.
+    """
+    def decorator(f):
+        def wrapper(*args, **kwargs):
+            current_version = version(**kwargs)
+            if current_version is None:
+                return f(*args, **kwargs)
+            key = (
+                f.__name__,
+                tuple(sorted(kwargs.items())),
+                tuple(sorted(request.args.items(multi=True))),
+                date.today(),
+                current_version
+            )
+            etag = hashlib.sha1(repr(key).encode()).hexdigest()
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                return response
+
+            with _response_cache_lock:
+                body = _response_cache.get(key)
+                if body is not None:
+                    _response_cache.move_to_end(key)
+            if body is None:
+                response = current_app.make_response(f(*args, **kwargs))
+                # Streamed responses are opted into to avoid buffering, so they
+                # are passed through rather than collected for the cache
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                with _response_cache_lock:
+                    _response_cache[key] = body
+                    if len(_response_cache) > RESPONSE_CACHE_SIZE:
+                        _response_cache.popitem(last=False)
+
+            response = current_app.response_class(body, mimetype='application/json')
+            response.set_etag(etag)
+            return response
+        wrapper.__name__ = f.__name__
+        return wrapper
+    return decorator
+
+
+cached_forecast = cached_response(forecast_data_version)
+cached_staffing = cached_response(staffing_data_version)
+cached_planning_exercise = cached_response(planning_exercise_version)
+cached_planning_exercise_list = cached_response(planning_exercise_list_version)
+cached_planning_analysis = cached_response(planning_analysis_version)
+
+
+def analytics_replica(f):
+    """
+    Decorator running a read-only endpoint against the analytics read replica.
+
+    Apply it outside any response cache decorator so the cache's data version
+    is read from the same database as the response.
+    """
+    def wrapper(*args, **kwargs):
+        with use_analytics_replica():
+            return f(*args, **kwargs)
+    wrapper.__name__ = f.__name__
+    return wrapper
+
+
+def wants_stream():
+    """Check whether the client opted into a streamed list response"""
+    return request.args.get('stream', 'false').lower() in ('true', '1')
+
+
+def stream_json_list(rows, serialize, batch_size=500):
+    """
+    Stream rows as a JSON array, serializing one row at a time.
+
+    Queries are iterated with yield_per so rows are fetched in batches instead
+    of being loaded, converted and encoded all at once.
+    """
+    if hasattr(rows, 'yield_per'):
+        rows = rows.yield_per(batch_size)
+    json_provider = current_app.json
+
+    def generate():
+        yield '['
+        for index, row in enumerate(rows):
+            if index:
+                yield ','
+            yield json_provider.dumps(serialize(row))
+        yield ']'
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+
+def stream_json_object(payload, streamed_keys):
+    """
+    Stream a dict as a JSON object in sorted key order.
+
+    Lists under streamed_keys are encoded one item at a time; every other value
+    is encoded in one piece. This avoids building the full JSON document for
+    large reports in memory.
+    """
+    json_provider = current_app.json
+
+    def generate():
+        yield '{'
+        for index, key in enumerate(sorted(payload)):
+            if index:
+                yield ','
+            yield f'{json_provider.dumps(key)}:'
+            if key in streamed_keys:
+                yield '['
+                for item_index, item in enumerate(payload[key]):
+                    if item_index:
+                        yield ','
+                    yield json_provider.dumps(item)
+                yield ']'
+            else:
+                yield json_provider.dumps(payload[key])
+        yield '}'
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+
+# Session helpers used with safe_db_operation
+def add_and_commit(obj):
+    """Add an object to the session and commit"""
+    db.session.add(obj)
+    db.session.commit()
+
+
+def delete_and_commit(obj):
+    """Delete an object from the session and commit"""
+    db.session.delete(obj)
+    db.session.commit()
+
+
+def delete_returning_and_commit(target, *dependents):
+    """
+    Run the dependents' DELETEs, then the target's DELETE ... RETURNING id, as
+    one transaction without loading any rows.
+
+    Returns the deleted id, or None (after rolling back) when the target row
+    does not exist.
+    """
+    # Nothing is loaded, so there are no session objects to synchronize
+    options = {'synchronize_session': False}
+    for statement in dependents:
+        db.session.execute(statement, execution_options=options)
+    deleted_id = db.session.execute(target, execution_options=options).scalar_one_or_none()
+    if deleted_id is None:
+        db.session.rollback()
+    else:
+        db.session.commit()
+    return deleted_id
+
+
+def upsert_monthly_allocations_and_commit(rows):
+    """
+    Upsert monthly allocation rows and commit them with any pending changes as
+    one transaction, rolling the session back if any step fails
+    """
+    try:
+        # Pending changes are flushed once, by the commit
+        with db.session.no_autoflush:
+            upsert_monthly_allocations(rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def insert_planning_projects(exercise_id, project_rows, project_role_rows):
+    """
+    Bulk insert planning projects and, for each, its list of role rows.
+
+    Projects are inserted in one statement whose RETURNING ids come back in
+    row order, so each project's roles can be linked without loading ORM
+    objects. Returns the new project ids.
+    """
+    db, PlanningExercise, PlanningProject, PlanningRole, Role = get_planning_models()
+    if not project_rows:
+        return []
+    project_ids = db.session.scalars(
+        insert(PlanningProject).returning(PlanningProject.id, sort_by_parameter_order=True),
+        [{**row, 'exercise_id': exercise_id} for row in project_rows]
+    ).all()
+    role_rows = [
+        {**row, 'planning_project_id': project_id}
+        for project_id, rows in zip(project_ids, project_role_rows)
+        for row in rows
+    ]
+    if role_rows:
+        db.session.execute(insert(PlanningRole), role_rows)
+    return project_ids
+
+
+def add_planning_exercise_and_commit(exercise, project_rows, project_role_rows):
+    """Add a planning exercise, bulk insert its projects and roles, and commit"""
+    db.session.add(exercise)
+    db.session.flush()
+    insert_planning_projects(exercise.id, project_rows, project_role_rows)
+    db.session.commit()
+
+
+def insert_planning_project_and_commit(exercise_id, project_row, role_rows):
+    """Insert one planning project with its roles, commit, and return its id"""
+    project_id = insert_planning_projects(exercise_id, [project_row], [role_rows])[0]
+    db.session.commit()
+    return project_id
+
 # Validation helpers
 def validate_role_data(data, is_update=False):
     """Validate role data"""
-    validate_required(data, ['name', 'hourly_cost'])
+    validate_required(data, ('name', 'hourly_cost'))
 
     validate_positive_number(data['hourly_cost'], 'hourly_cost')
 
@@ -67,9 +459,122 @@ def validate_role_data(data, is_update=False):
             raise ConflictError(f"Role with name '{data['name']}' already exists")
 
 
+def parse_date(value, field=None, error_message=None):
+    """
+    Parse an ISO date string into a date, raising ValidationError when invalid.
+
+    Parsing is shared with the engine through parse_iso_date. error_message
+    may contain a {value} placeholder, which is only formatted on failure.
+    """
+    try:
+        return parse_iso_date(value)
+    except ValueError:
+        if error_message:
+            raise ValidationError(error_message.format(value=value))
+        if field:
+            raise ValidationError(f"Invalid date format for {field}")
+        raise ValidationError("Invalid date format. Use YYYY-MM-DD")
+
+
+def parse_optional_date(value, field=None, error_message=None):
+    """Parse an optional ISO date string, returning None when it is empty or missing"""
+    if not value:
+        return None
+    return parse_date(value, field, error_message)
+
+
+def parse_required_date_range_args():
+    """Parse the required start_date and end_date query parameters into dates"""
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    if not start_date or not end_date:
+        raise ValidationError("start_date and end_date parameters are required")
+    return parse_date(start_date), parse_date(end_date)
+
+
+def parse_optional_dates(data, fields):
+    """
+    Parse optional ISO date fields from request data.
+
+    Returns a dict keyed by field name for every field present in data,
+    holding a date object (or None when the value is empty).
+    """
+    parsed_dates = {}
+    for field in fields:
+        if data.get(field):
+            parsed_dates[field] = parse_date(data[field], field)
+        elif field in data:
+            parsed_dates[field] = None
+    return parsed_dates
+
+
+def iter_month_starts(start, end):
+    """Yield the first day of each month from start's month through end's month"""
+    first_index = start.year * 12 + start.month - 1
+    last_index = end.year * 12 + end.month - 1
+    for month_index in range(first_index, last_index + 1):
+        yield date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def parse_monthly_allocations(allocations):
+    """
+    Validate a list of monthly allocation entries.
+
+    Returns a dict mapping each month (normalized to its first day) to its
+    allocation percentage; later entries for the same month win.
+    """
+    if not isinstance(allocations, list):
+        raise ValidationError("'allocations' must be an array")
+
+    allocations_by_month = {}
+    for alloc_data in allocations:
+        if not isinstance(alloc_data, dict) or 'month' not in alloc_data:
+            raise ValidationError("Each allocation must have a 'month' field")
+        if not isinstance(alloc_data['month'], str):
+            raise ValidationError("'month' must be an ISO date string")
+        
+        month_date = parse_date(alloc_data['month'], 'month')
+        # Normalize to first of month
+        month_date = month_date.replace(day=1)
+        
+        allocation_pct = alloc_data.get('allocation_percentage', 100.0)
+        if not isinstance(allocation_pct, (int, float)) or allocation_pct < 0 or allocation_pct > 100:
+            raise ValidationError(f"allocation_percentage for {month_date} must be between 0 and 100")
+
+        allocations_by_month[month_date] = allocation_pct
+    return allocations_by_month
+
+
+def upsert_monthly_allocations(rows):
+    """
+    Insert monthly allocation rows in a single statement, updating the
+    percentage of any (assignment_id, month) pair that already exists.
+    """
+    if not rows:
+        return
+    db, Staff, Project, Assignment, Role, ProjectRoleRate, AssignmentMonthlyAllocation = get_models()
+
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    # Rows are passed as parameters rather than inlined with .values() so the
+    # compiled statement is the same, and cached, whatever the row count
+    stmt = insert(AssignmentMonthlyAllocation)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['assignment_id', 'month'],
+        set_={
+            'allocation_percentage': stmt.excluded.allocation_percentage,
+            'updated_at': stmt.excluded.updated_at
+        }
+    )
+    db.session.execute(stmt, rows)
+
+
 def validate_staff_data(data):
-    """Validate staff data"""
-    validate_required(data, ['name', 'role_id', 'internal_hourly_cost'])
+    """Validate staff data and return parsed availability dates"""
+    validate_required(data, ('name', 'role_id', 'internal_hourly_cost'))
 
     validate_positive_number(data['internal_hourly_cost'], 'internal_hourly_cost')
 
@@ -79,47 +584,22 @@ def validate_staff_data(data):
     if not role:
         raise NotFoundError("Role", data['role_id'])
 
-    # Optional date validation and range check
-    if 'availability_start' in data and data['availability_start']:
-        try:
-            datetime.fromisoformat(data['availability_start'])
-        except ValueError:
-            raise ValidationError("Invalid date format for availability_start")
-
-    if 'availability_end' in data and data['availability_end']:
-        try:
-            datetime.fromisoformat(data['availability_end'])
-        except ValueError:
-            raise ValidationError("Invalid date format for availability_end")
+    # Parse optional dates once so callers can reuse them
+    parsed_dates = parse_optional_dates(data, ['availability_start', 'availability_end'])
+    validate_date_range(parsed_dates.get('availability_start'), parsed_dates.get('availability_end'),
+                        "availability_start", "availability_end")
 
-    if data.get('availability_start') and data.get('availability_end'):
-        start_date = datetime.fromisoformat(data['availability_start']).date()
-        end_date = datetime.fromisoformat(data['availability_end']).date()
-        validate_date_range(start_date, end_date, "availability_start", "availability_end")
+    return parsed_dates
 
 def validate_project_data(data, current_project_id=None):
-    """Validate project data including hierarchy rules"""
-    validate_required(data, ['name', 'status'])
-
-    validate_enum(data['status'], ['planning', 'active', 'completed', 'cancelled', 'on-hold'], 'status')
-
-    # Optional date validation
-    if 'start_date' in data and data['start_date']:
-        try:
-            datetime.fromisoformat(data['start_date'])
-        except ValueError:
-            raise ValidationError("Invalid date format for start_date")
+    """Validate project data including hierarchy rules and return parsed dates"""
+    validate_required(data, ('name', 'status'))
 
-    if 'end_date' in data and data['end_date']:
-        try:
-            datetime.fromisoformat(data['end_date'])
-        except ValueError:
-            raise ValidationError("Invalid date format for end_date")
+    validate_enum(data['status'], PROJECT_STATUSES, 'status')
 
-    if data.get('start_date') and data.get('end_date'):
-        start_date = datetime.fromisoformat(data['start_date']).date()
-        end_date = datetime.fromisoformat(data['end_date']).date()
-        validate_date_range(start_date, end_date, "start_date", "end_date")
+    # Parse optional dates once so callers can reuse them
+    parsed_dates = parse_optional_dates(data, ['start_date', 'end_date'])
+    validate_date_range(parsed_dates.get('start_date'), parsed_dates.get('end_date'), "start_date", "end_date")
 
     if 'budget' in data and data['budget'] is not None:
         if not isinstance(data['budget'], (int, float)) or data['budget'] < 0:
@@ -155,6 +635,8 @@ def validate_project_data(data, current_project_id=None):
         if current_project and current_project.sub_projects:
             raise ValidationError("Cannot convert a folder with sub-projects to a non-folder")
 
+    return parsed_dates
+
 
 def is_descendant_of(project_id, potential_ancestor_id):
     """Check if project_id is a descendant of potential_ancestor_id"""
@@ -167,9 +649,59 @@ def is_descendant_of(project_id, potential_ancestor_id):
         project = project.parent_project
     return False
 
+def serialize_projects_with_children(projects):
+    """
+    Serialize projects with their direct sub-projects, loading the children in
+    one query and their own sub-project counts in one grouped COUNT, instead
+    of lazy-loading sub_projects per row.
+    """
+    if not projects:
+        return []
+
+    db, Project, ProjectRoleRate, Role = get_project_models()
+
+    project_ids = [p.id for p in projects]
+    children = Project.query.filter(Project.parent_project_id.in_(project_ids)).order_by(Project.id).all()
+
+    children_by_parent = defaultdict(list)
+    for child in children:
+        children_by_parent[child.parent_project_id].append(child)
+
+    # Children only need how many sub-projects they have, not the rows
+    child_counts = dict(
+        db.session.query(Project.parent_project_id, func.count(Project.id))
+        .filter(Project.parent_project_id.in_([child.id for child in children]))
+        .group_by(Project.parent_project_id)
+        .all()
+    ) if children else {}
+    child_counts.update((project_id, len(children_by_parent[project_id])) for project_id in project_ids)
+
+    names_by_id = {p.id: p.name for p in projects}
+    missing_parent_ids = {p.parent_project_id for p in projects
+                          if p.parent_project_id is not None and p.parent_project_id not in names_by_id}
+    if missing_parent_ids:
+        names_by_id.update(
+            db.session.query(Project.id, Project.name).filter(Project.id.in_(missing_parent_ids)).all()
+        )
+
+    def summarize(project):
+        return project.to_summary_dict(
+            parent_project_name=names_by_id.get(project.parent_project_id),
+            sub_projects_count=child_counts.get(project.id, 0)
+        )
+
+    result = []
+    for project in projects:
+        data = summarize(project)
+        if children_by_parent[project.id]:
+            data['sub_projects'] = [summarize(child) for child in children_by_parent[project.id]]
+        result.append(data)
+    return result
+
+
 def validate_assignment_data(data, db, Staff, Project):
-    """Validate assignment data"""
-    validate_required(data, ['staff_id', 'project_id', 'start_date', 'end_date', 'hours_per_week'])
+    """Validate assignment data and return parsed start/end dates"""
+    validate_required(data, ('staff_id', 'project_id', 'start_date', 'end_date', 'hours_per_week'))
 
     # Check if staff exists
     staff = db.session.get(Staff, data['staff_id'])
@@ -182,28 +714,27 @@ def validate_assignment_data(data, db, Staff, Project):
         raise NotFoundError("Project", data['project_id'])
 
     # Date validation
-    try:
-        start_date = datetime.fromisoformat(data['start_date']).date()
-        end_date = datetime.fromisoformat(data['end_date']).date()
-    except ValueError:
-        raise ValidationError("Invalid date format")
+    start_date = parse_date(data['start_date'], error_message="Invalid date format")
+    end_date = parse_date(data['end_date'], error_message="Invalid date format")
 
     validate_date_range(start_date, end_date, "start_date", "end_date")
     validate_positive_number(data['hours_per_week'], 'hours_per_week')
     
     # Validate allocation fields
-    from models import Assignment
-    valid_allocation_types = Assignment.ALLOCATION_TYPES
+    valid_allocation_types, allocation_type_error = get_allocation_type_validation()
     
     if 'allocation_type' in data:
-        if data['allocation_type'] not in valid_allocation_types:
-            raise ValidationError(f"Invalid allocation_type. Must be one of: {', '.join(valid_allocation_types)}")
+        allocation_type = data['allocation_type']
+        if not isinstance(allocation_type, str) or allocation_type not in valid_allocation_types:
+            raise ValidationError(allocation_type_error)
     
     if 'allocation_percentage' in data:
         allocation_pct = data['allocation_percentage']
         if not isinstance(allocation_pct, (int, float)) or allocation_pct < 0 or allocation_pct > 100:
             raise ValidationError("allocation_percentage must be a number between 0 and 100")
 
+    return {'start_date': start_date, 'end_date': end_date}
+
 
 # ROLE ENDPOINTS
 
@@ -242,7 +773,7 @@ def create_role():
         is_active=data.get('is_active', True)
     )
 
-    safe_db_operation(lambda: (db.session.add(role), db.session.commit())[1], "Failed to create role")
+    safe_db_operation(add_and_commit, "Failed to create role", args=(role,))
 
     return jsonify(role.to_dict()), 201
 
@@ -301,11 +832,13 @@ def delete_role(role_id):
     if not role:
         raise NotFoundError("Role", role_id)
 
-    # Check if any staff members are assigned to this role
-    if role.staff_members:
-        raise ConflictError(f"Cannot delete role '{role.name}' - {len(role.staff_members)} staff member(s) assigned")
+    # Check if any staff members are assigned to this role without loading them
+    from models import Staff
+    if db.session.query(exists().where(Staff.role_id == role_id)).scalar():
+        staff_count = db.session.query(func.count(Staff.id)).filter(Staff.role_id == role_id).scalar()
+        raise ConflictError(f"Cannot delete role '{role.name}' - {staff_count} staff member(s) assigned")
 
-    safe_db_operation(lambda: (db.session.delete(role), db.session.commit())[1], "Failed to delete role")
+    safe_db_operation(delete_and_commit, "Failed to delete role", args=(role,))
 
     return jsonify({'message': 'Role deleted successfully'})
 
@@ -334,24 +867,18 @@ def get_staff():
         query = query.join(Role).filter(Role.name.ilike(f'%{role_name}%'))
 
     if available_from:
-        try:
-            from_date = datetime.fromisoformat(available_from).date()
-            query = query.filter(
-                (Staff.availability_start <= from_date) |
-                (Staff.availability_start.is_(None))
-            )
-        except ValueError:
-            raise ValueError("Invalid date format for available_from")
+        from_date = parse_date(available_from, 'available_from')
+        query = query.filter(
+            (Staff.availability_start <= from_date) |
+            (Staff.availability_start.is_(None))
+        )
 
     if available_to:
-        try:
-            to_date = datetime.fromisoformat(available_to).date()
-            query = query.filter(
-                (Staff.availability_end >= to_date) |
-                (Staff.availability_end.is_(None))
-            )
-        except ValueError:
-            raise ValueError("Invalid date format for available_to")
+        to_date = parse_date(available_to, 'available_to')
+        query = query.filter(
+            (Staff.availability_end >= to_date) |
+            (Staff.availability_end.is_(None))
+        )
 
     if skills:
         skill_list = [s.strip() for s in skills.split(',')]
@@ -363,6 +890,8 @@ def get_staff():
                 staff_with_skills.append(staff)
         # Convert back to query result format
         staff_members = staff_with_skills
+    elif wants_stream():
+        return stream_json_list(query, Staff.to_dict)
     else:
         staff_members = query.all()
 
@@ -376,29 +905,20 @@ def create_staff():
 
     data = request.get_json()
 
-    validate_staff_data(data)
-
-    # Convert date strings to date objects
-    availability_start = None
-    availability_end = None
-
-    if data.get('availability_start'):
-        availability_start = datetime.fromisoformat(data['availability_start']).date()
-    if data.get('availability_end'):
-        availability_end = datetime.fromisoformat(data['availability_end']).date()
+    parsed_dates = validate_staff_data(data)
 
     staff = Staff(
         name=data['name'],
         role_id=data['role_id'],
         internal_hourly_cost=data['internal_hourly_cost'],
-        availability_start=availability_start,
-        availability_end=availability_end
+        availability_start=parsed_dates.get('availability_start'),
+        availability_end=parsed_dates.get('availability_end')
     )
 
     if 'skills' in data:
         staff.set_skills_list(data['skills'])
 
-    safe_db_operation(lambda: (db.session.add(staff), db.session.commit())[1], "Failed to create staff member")
+    safe_db_operation(add_and_commit, "Failed to create staff member", args=(staff,))
 
     return jsonify(staff.to_dict()), 201
 
@@ -427,7 +947,7 @@ def update_staff(staff_id):
     data = request.get_json()
 
     # Validate data
-    validate_staff_data(data)
+    parsed_dates = validate_staff_data(data)
 
     # Update fields
     staff.name = data['name']
@@ -435,10 +955,10 @@ def update_staff(staff_id):
     staff.internal_hourly_cost = data['internal_hourly_cost']
 
     # Handle dates
-    if 'availability_start' in data:
-        staff.availability_start = datetime.fromisoformat(data['availability_start']).date() if data['availability_start'] else None
-    if 'availability_end' in data:
-        staff.availability_end = datetime.fromisoformat(data['availability_end']).date() if data['availability_end'] else None
+    if 'availability_start' in parsed_dates:
+        staff.availability_start = parsed_dates['availability_start']
+    if 'availability_end' in parsed_dates:
+        staff.availability_end = parsed_dates['availability_end']
 
     # Handle skills
     if 'skills' in data:
@@ -459,10 +979,10 @@ def delete_staff(staff_id):
         raise NotFoundError("Staff", staff_id)
 
     # Check if staff has assignments
-    if staff.assignments:
+    if db.session.query(exists().where(Assignment.staff_id == staff_id)).scalar():
         raise ConflictError("Cannot delete staff member with active assignments")
 
-    safe_db_operation(lambda: (db.session.delete(staff), db.session.commit())[1], "Failed to delete staff member")
+    safe_db_operation(delete_and_commit, "Failed to delete staff member", args=(staff,))
 
     return jsonify({'message': 'Staff member deleted successfully'})
 
@@ -501,8 +1021,13 @@ def get_projects():
         is_folder_bool = is_folder.lower() == 'true'
         query = query.filter(Project.is_folder == is_folder_bool)
 
+    if not include_children and wants_stream():
+        return stream_json_list(query, Project.to_dict)
+
     projects = query.all()
-    return jsonify([project.to_dict(include_children=include_children) for project in projects])
+    if include_children:
+        return jsonify(serialize_projects_with_children(projects))
+    return jsonify([project.to_dict() for project in projects])
 
 @api.route('/projects', methods=['POST'])
 @handle_errors
@@ -512,21 +1037,12 @@ def create_project():
 
     data = request.get_json()
 
-    validate_project_data(data)
-
-    # Convert date strings to date objects
-    start_date = None
-    end_date = None
-
-    if data.get('start_date'):
-        start_date = datetime.fromisoformat(data['start_date']).date()
-    if data.get('end_date'):
-        end_date = datetime.fromisoformat(data['end_date']).date()
+    parsed_dates = validate_project_data(data)
 
     project = Project(
         name=data['name'],
-        start_date=start_date,
-        end_date=end_date,
+        start_date=parsed_dates.get('start_date'),
+        end_date=parsed_dates.get('end_date'),
         status=data['status'],
         budget=data.get('budget'),
         location=data.get('location'),
@@ -534,22 +1050,26 @@ def create_project():
         is_folder=data.get('is_folder', False)
     )
 
-    safe_db_operation(lambda: (db.session.add(project), db.session.commit())[1], "Failed to create project")
+    safe_db_operation(add_and_commit, "Failed to create project", args=(project,))
 
     # Auto-populate role rates from active roles with default billable rates
     active_roles = Role.query.filter_by(is_active=True).all()
-    for role in active_roles:
-        if role.default_billable_rate is not None:
-            rate = ProjectRoleRate(
-                project_id=project.id,
-                role_id=role.id,
-                billable_rate=role.default_billable_rate
-            )
-            db.session.add(rate)
+    rate_rows = [
+        {
+            'project_id': project.id,
+            'role_id': role.id,
+            'billable_rate': role.default_billable_rate
+        }
+        for role in active_roles
+        if role.default_billable_rate is not None
+    ]
+    if rate_rows:
+        db.session.bulk_insert_mappings(ProjectRoleRate, rate_rows)
     
     safe_db_operation(db.session.commit, "Failed to auto-populate project role rates")
 
-    return jsonify(project.to_dict(include_children=True)), 201
+    # A newly created project has no sub-projects to echo back
+    return jsonify(project.to_dict()), 201
 
 @api.route('/projects/<int:project_id>', methods=['GET'])
 @handle_errors
@@ -576,17 +1096,17 @@ def update_project(project_id):
 
     data = request.get_json()
 
-    validate_project_data(data, current_project_id=project_id)
+    parsed_dates = validate_project_data(data, current_project_id=project_id)
 
     # Update fields
     project.name = data['name']
     project.status = data['status']
 
     # Handle dates
-    if 'start_date' in data:
-        project.start_date = datetime.fromisoformat(data['start_date']).date() if data['start_date'] else None
-    if 'end_date' in data:
-        project.end_date = datetime.fromisoformat(data['end_date']).date() if data['end_date'] else None
+    if 'start_date' in parsed_dates:
+        project.start_date = parsed_dates['start_date']
+    if 'end_date' in parsed_dates:
+        project.end_date = parsed_dates['end_date']
 
     # Handle optional fields
     if 'budget' in data:
@@ -602,7 +1122,8 @@ def update_project(project_id):
 
     safe_db_operation(db.session.commit, "Failed to update project")
 
-    return jsonify(project.to_dict(include_children=True))
+    include_children = request.args.get('include_children', 'false').lower() == 'true'
+    return jsonify(project.to_dict(include_children=include_children))
 
 @api.route('/projects/<int:project_id>', methods=['DELETE'])
 @handle_errors
@@ -615,14 +1136,14 @@ def delete_project(project_id):
         raise NotFoundError("Project", project_id)
 
     # Check if project has assignments
-    if project.assignments:
+    if db.session.query(exists().where(Assignment.project_id == project_id)).scalar():
         raise ConflictError("Cannot delete project with active assignments")
     
     # Check if project has sub-projects
-    if project.sub_projects:
+    if db.session.query(exists().where(Project.parent_project_id == project_id)).scalar():
         raise ConflictError("Cannot delete project folder with sub-projects. Delete sub-projects first.")
 
-    safe_db_operation(lambda: (db.session.delete(project), db.session.commit())[1], "Failed to delete project")
+    safe_db_operation(delete_and_commit, "Failed to delete project", args=(project,))
 
     return jsonify({'message': 'Project deleted successfully'})
 
@@ -635,7 +1156,10 @@ def get_project_role_rates(project_id):
     """Get all role rates for a project (including inherited from parent)"""
     db, Project, ProjectRoleRate, Role = get_project_models()
 
-    project = db.session.get(Project, project_id)
+    # Load the explicit rates and their roles together with the project
+    project = db.session.get(Project, project_id, options=[
+        selectinload(Project.role_rates).joinedload(ProjectRoleRate.role)
+    ])
     if not project:
         raise NotFoundError("Project", project_id)
 
@@ -771,7 +1295,7 @@ def delete_project_role_rate(project_id, role_id):
     if not rate:
         raise NotFoundError("ProjectRoleRate", f"project_id={project_id}, role_id={role_id}")
     
-    safe_db_operation(lambda: (db.session.delete(rate), db.session.commit())[1], "Failed to delete project role rate")
+    safe_db_operation(delete_and_commit, "Failed to delete project role rate", args=(rate,))
     
     # Return info about inherited rate if available
     inherited_rate = project.get_role_rate(role_id)
@@ -800,6 +1324,9 @@ def get_assignments():
     if project_id:
         query = query.filter(Assignment.project_id == project_id)
 
+    if wants_stream():
+        return stream_json_list(query, Assignment.to_dict)
+
     assignments = query.all()
     return jsonify([assignment.to_dict() for assignment in assignments])
 
@@ -811,35 +1338,33 @@ def create_assignment():
 
     data = request.get_json()
 
-    validate_assignment_data(data, db, Staff, Project)
-
-    # Convert date strings to date objects
-    start_date = datetime.fromisoformat(data['start_date']).date()
-    end_date = datetime.fromisoformat(data['end_date']).date()
+    parsed_dates = validate_assignment_data(data, db, Staff, Project)
 
     assignment = Assignment(
         staff_id=data['staff_id'],
         project_id=data['project_id'],
-        start_date=start_date,
-        end_date=end_date,
+        start_date=parsed_dates['start_date'],
+        end_date=parsed_dates['end_date'],
         hours_per_week=data['hours_per_week'],
         role_on_project=data.get('role_on_project'),
         allocation_type=data.get('allocation_type', 'full'),
         allocation_percentage=data.get('allocation_percentage', 100.0)
     )
 
-    safe_db_operation(lambda: (db.session.add(assignment), db.session.commit())[1], "Failed to create assignment")
+    safe_db_operation(add_and_commit, "Failed to create assignment", args=(assignment,))
     
     # Handle monthly allocations if provided and type is percentage_monthly
     if data.get('allocation_type') == 'percentage_monthly' and data.get('monthly_allocations'):
-        for ma_data in data['monthly_allocations']:
-            month_date = datetime.fromisoformat(ma_data['month']).date()
-            monthly_allocation = AssignmentMonthlyAllocation(
-                assignment_id=assignment.id,
-                month=month_date,
-                allocation_percentage=ma_data.get('allocation_percentage', 100.0)
-            )
-            db.session.add(monthly_allocation)
+        # Insert all months in a single batch rather than one ORM object per row
+        mappings = [
+            {
+                'assignment_id': assignment.id,
+                'month': parse_date(ma_data['month'], 'month'),
+                'allocation_percentage': ma_data.get('allocation_percentage', 100.0)
+            }
+            for ma_data in data['monthly_allocations']
+        ]
+        db.session.bulk_insert_mappings(AssignmentMonthlyAllocation, mappings)
         safe_db_operation(db.session.commit, "Failed to save monthly allocations")
 
     return jsonify(assignment.to_dict(include_monthly_allocations=True)), 201
@@ -850,11 +1375,13 @@ def get_assignment_by_id(assignment_id):
     """Get a specific assignment by ID"""
     db, Staff, Project, Assignment, Role, ProjectRoleRate, AssignmentMonthlyAllocation = get_models()
 
-    assignment = db.session.get(Assignment, assignment_id)
+    include_monthly = request.args.get('include_monthly_allocations', 'true').lower() == 'true'
+    options = [selectinload(Assignment.monthly_allocations)] if include_monthly else []
+
+    assignment = db.session.get(Assignment, assignment_id, options=options)
     if not assignment:
         raise NotFoundError("Assignment", assignment_id)
 
-    include_monthly = request.args.get('include_monthly_allocations', 'true').lower() == 'true'
     return jsonify(assignment.to_dict(include_monthly_allocations=include_monthly))
 
 @api.route('/assignments/<int:assignment_id>', methods=['PUT'])
@@ -869,13 +1396,13 @@ def update_assignment(assignment_id):
 
     data = request.get_json()
 
-    validate_assignment_data(data, db, Staff, Project)
+    parsed_dates = validate_assignment_data(data, db, Staff, Project)
 
     # Update fields
     assignment.staff_id = data['staff_id']
     assignment.project_id = data['project_id']
-    assignment.start_date = datetime.fromisoformat(data['start_date']).date()
-    assignment.end_date = datetime.fromisoformat(data['end_date']).date()
+    assignment.start_date = parsed_dates['start_date']
+    assignment.end_date = parsed_dates['end_date']
     assignment.hours_per_week = data['hours_per_week']
     assignment.role_on_project = data.get('role_on_project')
     
@@ -899,7 +1426,7 @@ def delete_assignment(assignment_id):
     if not assignment:
         raise NotFoundError("Assignment", assignment_id)
 
-    safe_db_operation(lambda: (db.session.delete(assignment), db.session.commit())[1], "Failed to delete assignment")
+    safe_db_operation(delete_and_commit, "Failed to delete assignment", args=(assignment,))
 
     return jsonify({'message': 'Assignment deleted successfully'})
 
@@ -912,33 +1439,25 @@ def get_assignment_monthly_allocations(assignment_id):
     """Get monthly allocations for an assignment"""
     db, Staff, Project, Assignment, Role, ProjectRoleRate, AssignmentMonthlyAllocation = get_models()
 
-    assignment = db.session.get(Assignment, assignment_id)
+    assignment = db.session.get(Assignment, assignment_id, options=[
+        selectinload(Assignment.monthly_allocations)
+    ])
     if not assignment:
         raise NotFoundError("Assignment", assignment_id)
 
+    # Index existing allocations by (year, month) for constant-time lookup
+    alloc_map = {(ma.month.year, ma.month.month): ma for ma in assignment.monthly_allocations}
+
     # Generate month range for the assignment
-    from dateutil.relativedelta import relativedelta
-    from datetime import date
-    
     months = []
-    current_month = date(assignment.start_date.year, assignment.start_date.month, 1)
-    end_month = date(assignment.end_date.year, assignment.end_date.month, 1)
-    
-    while current_month <= end_month:
-        # Find existing allocation for this month
-        existing = next(
-            (ma for ma in assignment.monthly_allocations 
-             if ma.month.year == current_month.year and ma.month.month == current_month.month),
-            None
-        )
+    for current_month in iter_month_starts(assignment.start_date, assignment.end_date):
+        existing = alloc_map.get((current_month.year, current_month.month))
         
         months.append({
             'month': current_month.isoformat(),
             'allocation_percentage': existing.allocation_percentage if existing else 100.0,
             'id': existing.id if existing else None
         })
-        
-        current_month = current_month + relativedelta(months=1)
 
     return jsonify({
         'assignment_id': assignment_id,
@@ -965,76 +1484,98 @@ def update_assignment_monthly_allocations(assignment_id):
     # Set allocation type to percentage_monthly if updating monthly allocations
     assignment.allocation_type = 'percentage_monthly'
     
-    # Process each allocation
-    for alloc_data in data['allocations']:
-        if 'month' not in alloc_data:
-            raise ValidationError("Each allocation must have a 'month' field")
-        
-        month_date = datetime.fromisoformat(alloc_data['month']).date()
-        # Normalize to first of month
-        month_date = month_date.replace(day=1)
-        
-        allocation_pct = alloc_data.get('allocation_percentage', 100.0)
-        if not isinstance(allocation_pct, (int, float)) or allocation_pct < 0 or allocation_pct > 100:
-            raise ValidationError(f"allocation_percentage for {month_date} must be between 0 and 100")
-        
-        # Find existing or create new
-        existing = AssignmentMonthlyAllocation.query.filter_by(
-            assignment_id=assignment_id,
-            month=month_date
-        ).first()
-        
-        if existing:
-            existing.allocation_percentage = allocation_pct
-        else:
-            new_allocation = AssignmentMonthlyAllocation(
-                assignment_id=assignment_id,
-                month=month_date,
-                allocation_percentage=allocation_pct
-            )
-            db.session.add(new_allocation)
+    # Validate every allocation before touching the database
+    allocations_by_month = parse_monthly_allocations(data['allocations'])
 
-    safe_db_operation(db.session.commit, "Failed to update monthly allocations")
+    rows = [
+        {'assignment_id': assignment_id, 'month': month_date, 'allocation_percentage': allocation_pct}
+        for month_date, allocation_pct in allocations_by_month.items()
+    ]
+    safe_db_operation(upsert_monthly_allocations_and_commit, "Failed to update monthly allocations", args=(rows,))
 
     return jsonify(assignment.to_dict(include_monthly_allocations=True))
 
 
+@api.route('/assignments/monthly-allocations/batch', methods=['PUT'])
+@handle_errors
+def batch_update_assignment_monthly_allocations():
+    """Update monthly allocations for several assignments in one request"""
+    db, Staff, Project, Assignment, Role, ProjectRoleRate, AssignmentMonthlyAllocation = get_models()
+
+    data = request.get_json()
+
+    if not data or not isinstance(data.get('assignments'), list) or not data['assignments']:
+        raise ValidationError("'assignments' array is required")
+
+    # Validate every entry before touching the database
+    allocations_by_assignment = {}
+    for entry in data['assignments']:
+        if not isinstance(entry, dict) or 'assignment_id' not in entry or 'allocations' not in entry:
+            raise ValidationError("Each entry must have 'assignment_id' and 'allocations' fields")
+        if not isinstance(entry['assignment_id'], int) or isinstance(entry['assignment_id'], bool):
+            raise ValidationError("'assignment_id' must be an integer")
+        allocations_by_assignment.setdefault(entry['assignment_id'], {}).update(
+            parse_monthly_allocations(entry['allocations'])
+        )
+
+    assignment_ids = list(allocations_by_assignment)
+    assignments = Assignment.query.filter(Assignment.id.in_(assignment_ids)).all()
+    found_ids = {assignment.id for assignment in assignments}
+    for assignment_id in assignment_ids:
+        if assignment_id not in found_ids:
+            raise NotFoundError("Assignment", assignment_id)
+
+    # Set allocation type to percentage_monthly if updating monthly allocations
+    for assignment in assignments:
+        assignment.allocation_type = 'percentage_monthly'
+
+    rows = [
+        {'assignment_id': assignment_id, 'month': month_date, 'allocation_percentage': allocation_pct}
+        for assignment_id, allocations_by_month in allocations_by_assignment.items()
+        for month_date, allocation_pct in allocations_by_month.items()
+    ]
+    safe_db_operation(upsert_monthly_allocations_and_commit, "Failed to update monthly allocations", args=(rows,))
+
+    # Load every assignment's allocations, including the inserted rows, at once
+    assignments = Assignment.query.options(selectinload(Assignment.monthly_allocations)).filter(
+        Assignment.id.in_(assignment_ids)
+    ).order_by(Assignment.id).all()
+
+    return jsonify({
+        'assignments': [assignment.to_dict(include_monthly_allocations=True) for assignment in assignments]
+    })
+
+
 # FORECASTING ENDPOINTS
 
 @api.route('/projects/<int:project_id>/forecast', methods=['GET'])
 @handle_errors
+@cached_forecast
 def get_project_forecast(project_id):
     """Get staffing forecast for a specific project"""
-    from engine import calculate_project_staffing_needs
-
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
 
     # Convert string dates to date objects
-    start = None
-    end = None
-    if start_date:
-        start = datetime.fromisoformat(start_date).date()
-    if end_date:
-        end = datetime.fromisoformat(end_date).date()
+    start = parse_optional_date(start_date, 'start_date')
+    end = parse_optional_date(end_date, 'end_date')
 
     forecast = calculate_project_staffing_needs(project_id, start, end)
     return jsonify(forecast)
 
 @api.route('/forecasts/organization', methods=['GET'])
 @handle_errors
+@cached_forecast
 def get_organization_forecast():
     """Get organization-wide staffing forecast"""
-    from engine import calculate_organization_forecast
-
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
 
     if not start_date or not end_date:
         return jsonify({'error': 'start_date and end_date are required'}), 400
 
-    start = datetime.fromisoformat(start_date).date()
-    end = datetime.fromisoformat(end_date).date()
+    start = parse_date(start_date, 'start_date')
+    end = parse_date(end_date, 'end_date')
 
     forecast = calculate_organization_forecast(start, end)
     return jsonify(forecast)
@@ -1043,8 +1584,6 @@ def get_organization_forecast():
 @handle_errors
 def simulate_forecast():
     """Simulate what-if scenarios for forecasting"""
-    from engine import simulate_scenario
-
     data = request.get_json()
 
     if not data or 'project_id' not in data:
@@ -1058,10 +1597,9 @@ def simulate_forecast():
 
 @api.route('/projects/<int:project_id>/cost', methods=['GET'])
 @handle_errors
+@cached_forecast
 def get_project_cost(project_id):
     """Get cost analysis for a specific project"""
-    from engine import calculate_project_cost
-
     cost_analysis = calculate_project_cost(project_id)
     return jsonify(cost_analysis)
 
@@ -1069,18 +1607,12 @@ def get_project_cost(project_id):
 @handle_errors
 def get_staffing_gaps():
     """Detect staffing gaps"""
-    from engine import detect_staffing_gaps
-
     project_id = request.args.get('project_id', type=int)
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
 
-    start = None
-    end = None
-    if start_date:
-        start = datetime.fromisoformat(start_date).date()
-    if end_date:
-        end = datetime.fromisoformat(end_date).date()
+    start = parse_optional_date(start_date, 'start_date')
+    end = parse_optional_date(end_date, 'end_date')
 
     gaps = detect_staffing_gaps(project_id, start, end)
     return jsonify({'gaps': gaps, 'count': len(gaps)})
@@ -1089,8 +1621,6 @@ def get_staffing_gaps():
 @handle_errors
 def get_capacity_analysis():
     """Get capacity analysis for staff"""
-    from engine import calculate_capacity_analysis
-
     staff_id = request.args.get('staff_id', type=int)
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
@@ -1098,8 +1628,8 @@ def get_capacity_analysis():
     if not start_date or not end_date:
         return jsonify({'error': 'start_date and end_date are required'}), 400
 
-    start = datetime.fromisoformat(start_date).date()
-    end = datetime.fromisoformat(end_date).date()
+    start = parse_date(start_date, 'start_date')
+    end = parse_date(end_date, 'end_date')
 
     analysis = calculate_capacity_analysis(staff_id, start, end)
     return jsonify(analysis)
@@ -1113,7 +1643,7 @@ def login():
     """Authenticate user and return tokens"""
     data = request.get_json()
 
-    validate_required(data, ['username', 'password'])
+    validate_required(data, ('username', 'password'))
 
     result = login_user(data['username'], data['password'])
     return jsonify(result), 200
@@ -1134,7 +1664,7 @@ def register():
     """Register a new user (admin only)"""
     data = request.get_json()
 
-    validate_required(data, ['username', 'email', 'password'])
+    validate_required(data, ('username', 'email', 'password'))
 
     user = register_user(
         username=data['username'],
@@ -1177,10 +1707,12 @@ def logout():
 def get_users():
     """Get all users (admin only)"""
     db, Staff, Project, Assignment, Role, ProjectRoleRate, AssignmentMonthlyAllocation = get_models()
-    from models import User
+    from models import User, column_projection, get_column_serializer
 
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users]), 200
+    # Select only the serialized columns and skip building User instances
+    rows = db.session.execute(select(*column_projection(User, exclude=User.SENSITIVE_COLUMNS))).all()
+    serialize = get_column_serializer(User, User.SENSITIVE_COLUMNS)
+    return jsonify([serialize(row) for row in rows]), 200
 
 
 @api.route('/users/<int:user_id>', methods=['GET'])
@@ -1243,11 +1775,14 @@ def delete_user(user_id):
         raise NotFoundError("User", user_id)
 
     # Prevent deleting the last admin
-    admin_count = User.query.filter_by(role='admin').count()
-    if user.role == 'admin' and admin_count <= 1:
-        raise ConflictError("Cannot delete the last admin user")
+    if user.role == 'admin':
+        has_other_admin = db.session.query(
+            exists().where(User.role == 'admin', User.id != user_id)
+        ).scalar()
+        if not has_other_admin:
+            raise ConflictError("Cannot delete the last admin user")
 
-    safe_db_operation(lambda: (db.session.delete(user), db.session.commit())[1], "Failed to delete user")
+    safe_db_operation(delete_and_commit, "Failed to delete user", args=(user,))
 
     return jsonify({'message': 'User deleted successfully'}), 200
 
@@ -1256,9 +1791,12 @@ def delete_user(user_id):
 
 def get_template_models():
     """Import template-related models"""
-    from db import db
-    from models import ProjectTemplate, TemplateRole, Role, Project, GhostStaff, ProjectRoleRate
-    return db, ProjectTemplate, TemplateRole, Role, Project, GhostStaff, ProjectRoleRate
+    global _template_models
+    if _template_models is None:
+        from db import db
+        from models import ProjectTemplate, TemplateRole, Role, Project, GhostStaff, ProjectRoleRate
+        _template_models = (db, ProjectTemplate, TemplateRole, Role, Project, GhostStaff, ProjectRoleRate)
+    return _template_models
 
 
 @api.route('/templates', methods=['GET'])
@@ -1269,7 +1807,10 @@ def get_templates():
     
     active_only = request.args.get('active_only', 'false').lower() == 'true'
     
-    query = ProjectTemplate.query
+    # Load every template's roles and their role details in batched IN queries
+    query = ProjectTemplate.query.options(
+        selectinload(ProjectTemplate.template_roles).selectinload(TemplateRole.role)
+    )
     if active_only:
         query = query.filter_by(is_active=True)
     
@@ -1285,7 +1826,7 @@ def create_template():
     
     data = request.get_json()
     
-    validate_required(data, ['name', 'duration_months'])
+    validate_required(data, ('name', 'duration_months'))
     validate_positive_number(data['duration_months'], 'duration_months')
     
     template = ProjectTemplate(
@@ -1296,12 +1837,12 @@ def create_template():
         is_active=data.get('is_active', True)
     )
     
-    safe_db_operation(lambda: (db.session.add(template), db.session.commit())[1], "Failed to create template")
+    safe_db_operation(add_and_commit, "Failed to create template", args=(template,))
     
     # Add roles if provided
     if 'roles' in data and data['roles']:
         for role_data in data['roles']:
-            validate_required(role_data, ['role_id', 'count', 'start_month'])
+            validate_required(role_data, ('role_id', 'count', 'start_month'))
             
             # Validate role exists
             role = db.session.get(Role, role_data['role_id'])
@@ -1337,7 +1878,9 @@ def get_template(template_id):
     """Get a specific template by ID"""
     db, ProjectTemplate, TemplateRole, Role, Project, GhostStaff, ProjectRoleRate = get_template_models()
     
-    template = db.session.get(ProjectTemplate, template_id)
+    template = db.session.get(ProjectTemplate, template_id, options=[
+        selectinload(ProjectTemplate.template_roles).selectinload(TemplateRole.role)
+    ])
     if not template:
         raise NotFoundError("Template", template_id)
     
@@ -1376,7 +1919,7 @@ def update_template(template_id):
         
         # Add new roles
         for role_data in data['roles']:
-            validate_required(role_data, ['role_id', 'count', 'start_month'])
+            validate_required(role_data, ('role_id', 'count', 'start_month'))
             
             role = db.session.get(Role, role_data['role_id'])
             if not role:
@@ -1414,7 +1957,7 @@ def delete_template(template_id):
     if not template:
         raise NotFoundError("Template", template_id)
     
-    safe_db_operation(lambda: (db.session.delete(template), db.session.commit())[1], "Failed to delete template")
+    safe_db_operation(delete_and_commit, "Failed to delete template", args=(template,))
     
     return jsonify({'message': 'Template deleted successfully'})
 
@@ -1428,15 +1971,17 @@ def create_project_from_template():
     
     data = request.get_json()
     
-    validate_required(data, ['template_id', 'name', 'start_date'])
+    validate_required(data, ('template_id', 'name', 'start_date'))
     
-    # Get template
-    template = db.session.get(ProjectTemplate, data['template_id'])
+    # Get template with its roles
+    template = db.session.get(ProjectTemplate, data['template_id'], options=[
+        selectinload(ProjectTemplate.template_roles)
+    ])
     if not template:
         raise NotFoundError("Template", data['template_id'])
     
     # Parse start date
-    start_date = datetime.fromisoformat(data['start_date']).date()
+    start_date = parse_date(data['start_date'], 'start_date')
     
     # Calculate end date from template duration
     end_date = start_date + relativedelta(months=template.duration_months)
@@ -1453,25 +1998,34 @@ def create_project_from_template():
         is_folder=data.get('is_folder', False)
     )
     
-    safe_db_operation(lambda: (db.session.add(project), db.session.commit())[1], "Failed to create project")
+    safe_db_operation(add_and_commit, "Failed to create project", args=(project,))
     
+    # Load the roles the template uses together with the active roles that
+    # seed default rates in a single query
+    template_roles = template.template_roles
+    roles = Role.query.filter(or_(
+        Role.is_active == True,
+        Role.id.in_({template_role.role_id for template_role in template_roles})
+    )).all()
+    role_map = {role.id: role for role in roles}
+
     # Auto-populate role rates from active roles
-    active_roles = Role.query.filter_by(is_active=True).all()
-    for role in active_roles:
-        if role.default_billable_rate is not None:
-            rate = ProjectRoleRate(
-                project_id=project.id,
-                role_id=role.id,
-                billable_rate=role.default_billable_rate
-            )
-            db.session.add(rate)
-    
-    safe_db_operation(db.session.commit, "Failed to create project role rates")
-    
-    # Create ghost staff from template roles
-    ghost_staff_created = []
-    for template_role in template.template_roles:
-        role = template_role.role
+    rate_rows = [
+        {
+            'project_id': project.id,
+            'role_id': role.id,
+            'billable_rate': role.default_billable_rate
+        }
+        for role in roles
+        if role.is_active and role.default_billable_rate is not None
+    ]
+    if rate_rows:
+        db.session.bulk_insert_mappings(ProjectRoleRate, rate_rows)
+
+    # Create ghost staff from template roles, committed together with the rates
+    ghost_rows = []
+    for template_role in template_roles:
+        role = role_map[template_role.role_id]
         
         # Calculate ghost start/end dates
         ghost_start = start_date + relativedelta(months=template_role.start_month - 1)
@@ -1485,23 +2039,27 @@ def create_project_from_template():
         billable_rate = rate_info['rate'] if rate_info else role.default_billable_rate
         
         # Create ghost staff for each count
-        for i in range(template_role.count):
-            ghost_name = f"{role.name} Placeholder {i + 1}"
-            
-            ghost = GhostStaff(
-                project_id=project.id,
-                role_id=role.id,
-                name=ghost_name,
-                internal_hourly_cost=role.hourly_cost,
-                billable_rate=billable_rate,
-                start_date=ghost_start,
-                end_date=ghost_end,
-                hours_per_week=template_role.hours_per_week
-            )
-            db.session.add(ghost)
-            ghost_staff_created.append(ghost)
+        ghost_rows.extend(
+            {
+                'project_id': project.id,
+                'role_id': role.id,
+                'name': f"{role.name} Placeholder {i + 1}",
+                'internal_hourly_cost': role.hourly_cost,
+                'billable_rate': billable_rate,
+                'start_date': ghost_start,
+                'end_date': ghost_end,
+                'hours_per_week': template_role.hours_per_week
+            }
+            for i in range(template_role.count)
+        )
+
+    if ghost_rows:
+        db.session.bulk_insert_mappings(GhostStaff, ghost_rows)
     
-    safe_db_operation(db.session.commit, "Failed to create ghost staff")
+    safe_db_operation(db.session.commit, "Failed to create project role rates and ghost staff")
+
+    # The project is new, so every ghost staff row on it was created above
+    ghost_staff_created = GhostStaff.query.filter_by(project_id=project.id).order_by(GhostStaff.id).all()
     
     return jsonify({
         'project': project.to_dict(include_children=True),
@@ -1559,7 +2117,11 @@ def replace_ghost_staff(ghost_id):
     from models import Staff, Assignment
     db, ProjectTemplate, TemplateRole, Role, Project, GhostStaff, ProjectRoleRate = get_template_models()
     
-    ghost = db.session.get(GhostStaff, ghost_id)
+    # Load the role and project used by the new assignment and the response
+    ghost = db.session.get(GhostStaff, ghost_id, options=[
+        joinedload(GhostStaff.role),
+        joinedload(GhostStaff.project)
+    ])
     if not ghost:
         raise NotFoundError("GhostStaff", ghost_id)
     
@@ -1567,12 +2129,14 @@ def replace_ghost_staff(ghost_id):
         raise ConflictError(f"Ghost staff '{ghost.name}' has already been replaced")
     
     data = request.get_json()
-    validate_required(data, ['staff_id'])
+    validate_required(data, ('staff_id',))
     
     staff = db.session.get(Staff, data['staff_id'])
     if not staff:
         raise NotFoundError("Staff", data['staff_id'])
     
+    role_on_project = ghost.role.name if ghost.role else None
+
     # Mark ghost as replaced
     ghost.replaced_by_staff_id = staff.id
     
@@ -1583,7 +2147,7 @@ def replace_ghost_staff(ghost_id):
         start_date=ghost.start_date,
         end_date=ghost.end_date,
         hours_per_week=ghost.hours_per_week,
-        role_on_project=ghost.role.name if ghost.role else None,
+        role_on_project=role_on_project,
         allocation_type='full',
         allocation_percentage=100.0
     )
@@ -1608,7 +2172,7 @@ def delete_ghost_staff(ghost_id):
     if not ghost:
         raise NotFoundError("GhostStaff", ghost_id)
     
-    safe_db_operation(lambda: (db.session.delete(ghost), db.session.commit())[1], "Failed to delete ghost staff")
+    safe_db_operation(delete_and_commit, "Failed to delete ghost staff", args=(ghost,))
     
     return jsonify({'message': 'Ghost staff deleted successfully'})
 
@@ -1627,9 +2191,8 @@ def get_staff_planning_report():
         start_date (optional): Report start date (YYYY-MM-DD)
         end_date (optional): Report end date (YYYY-MM-DD)
         include_sub_projects (optional, default 'true'): Whether to include sub-projects for folders
+        stream (optional, default 'false'): Stream the report, encoding roles and staff entries one at a time
     """
-    from engine import generate_staff_planning_report
-    
     project_id = request.args.get('project_id', type=int)
     if not project_id:
         raise ValidationError("project_id parameter is required")
@@ -1639,20 +2202,8 @@ def get_staff_planning_report():
     include_sub_projects = request.args.get('include_sub_projects', 'true').lower() == 'true'
     
     # Parse dates if provided
-    parsed_start = None
-    parsed_end = None
-    
-    if start_date:
-        try:
-            parsed_start = datetime.fromisoformat(start_date).date()
-        except ValueError:
-            raise ValidationError(f"Invalid start_date format: {start_date}. Use YYYY-MM-DD")
-    
-    if end_date:
-        try:
-            parsed_end = datetime.fromisoformat(end_date).date()
-        except ValueError:
-            raise ValidationError(f"Invalid end_date format: {end_date}. Use YYYY-MM-DD")
+    parsed_start = parse_optional_date(start_date, error_message="Invalid start_date format: {value}. Use YYYY-MM-DD")
+    parsed_end = parse_optional_date(end_date, error_message="Invalid end_date format: {value}. Use YYYY-MM-DD")
     
     # Validate date range
     if parsed_start and parsed_end and parsed_start > parsed_end:
@@ -1665,10 +2216,13 @@ def get_staff_planning_report():
             end_date=parsed_end,
             include_sub_projects=include_sub_projects
         )
-        return jsonify(report)
     except ValueError as e:
         raise ValidationError(str(e))
 
+    if wants_stream():
+        return stream_json_object(report, ('roles', 'staff_entries'))
+    return jsonify(report)
+
 
 # =============================================================================
 # STAFF AVAILABILITY AND SUGGESTION ENDPOINTS
@@ -1676,6 +2230,8 @@ def get_staff_planning_report():
 
 @api.route('/forecasts/staff-availability', methods=['GET'])
 @handle_errors
+@analytics_replica
+@cached_staffing
 def get_staff_availability():
     """
     Get staff availability forecast for a given role and date range.
@@ -1685,27 +2241,13 @@ def get_staff_availability():
         start_date (optional): Start date (YYYY-MM-DD), defaults to today
         end_date (optional): End date (YYYY-MM-DD), defaults to 90 days from start
     """
-    from engine import get_staff_availability_forecast
-    
     role_id = request.args.get('role_id', type=int)
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
     # Parse dates
-    parsed_start = None
-    parsed_end = None
-    
-    if start_date:
-        try:
-            parsed_start = datetime.fromisoformat(start_date).date()
-        except ValueError:
-            raise ValidationError(f"Invalid start_date format: {start_date}. Use YYYY-MM-DD")
-    
-    if end_date:
-        try:
-            parsed_end = datetime.fromisoformat(end_date).date()
-        except ValueError:
-            raise ValidationError(f"Invalid end_date format: {end_date}. Use YYYY-MM-DD")
+    parsed_start = parse_optional_date(start_date, error_message="Invalid start_date format: {value}. Use YYYY-MM-DD")
+    parsed_end = parse_optional_date(end_date, error_message="Invalid end_date format: {value}. Use YYYY-MM-DD")
     
     result = get_staff_availability_forecast(
         role_id=role_id,
@@ -1717,6 +2259,7 @@ def get_staff_availability():
 
 @api.route('/forecasts/suggestions', methods=['GET'])
 @handle_errors
+@analytics_replica
 def get_staff_suggestions():
     """
     Get staff suggestions for a role based on availability and assignment alignment.
@@ -1728,23 +2271,11 @@ def get_staff_suggestions():
         allocation_percentage (optional): Required allocation (default 100)
         max_suggestions (optional): Maximum suggestions to return (default 10)
     """
-    from engine import suggest_staff_for_role
-    
     role_id = request.args.get('role_id', type=int)
     if not role_id:
         raise ValidationError("role_id parameter is required")
     
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    
-    if not start_date or not end_date:
-        raise ValidationError("start_date and end_date parameters are required")
-    
-    try:
-        parsed_start = datetime.fromisoformat(start_date).date()
-        parsed_end = datetime.fromisoformat(end_date).date()
-    except ValueError:
-        raise ValidationError("Invalid date format. Use YYYY-MM-DD")
+    parsed_start, parsed_end = parse_required_date_range_args()
     
     allocation_percentage = request.args.get('allocation_percentage', type=float, default=100.0)
     max_suggestions = request.args.get('max_suggestions', type=int, default=10)
@@ -1764,6 +2295,7 @@ def get_staff_suggestions():
 
 @api.route('/forecasts/new-hire-needs', methods=['GET'])
 @handle_errors
+@analytics_replica
 def get_new_hire_needs():
     """
     Identify positions requiring new hires.
@@ -1775,23 +2307,11 @@ def get_new_hire_needs():
         required_count (optional): Number of staff needed (default 1)
         allocation_percentage (optional): Required allocation per person (default 100)
     """
-    from engine import flag_new_hire_needs
-    
     role_id = request.args.get('role_id', type=int)
     if not role_id:
         raise ValidationError("role_id parameter is required")
     
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    
-    if not start_date or not end_date:
-        raise ValidationError("start_date and end_date parameters are required")
-    
-    try:
-        parsed_start = datetime.fromisoformat(start_date).date()
-        parsed_end = datetime.fromisoformat(end_date).date()
-    except ValueError:
-        raise ValidationError("Invalid date format. Use YYYY-MM-DD")
+    parsed_start, parsed_end = parse_required_date_range_args()
     
     required_count = request.args.get('required_count', type=int, default=1)
     allocation_percentage = request.args.get('allocation_percentage', type=float, default=100.0)
@@ -1815,6 +2335,7 @@ def get_new_hire_needs():
 
 @api.route('/staff/<int:staff_id>/allocation-conflicts', methods=['GET'])
 @handle_errors
+@analytics_replica
 def get_staff_allocation_conflicts(staff_id):
     """
     Detect over-allocation conflicts for a staff member.
@@ -1823,19 +2344,7 @@ def get_staff_allocation_conflicts(staff_id):
         start_date (required): Start date (YYYY-MM-DD)
         end_date (required): End date (YYYY-MM-DD)
     """
-    from engine import detect_over_allocations
-    
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    
-    if not start_date or not end_date:
-        raise ValidationError("start_date and end_date parameters are required")
-    
-    try:
-        parsed_start = datetime.fromisoformat(start_date).date()
-        parsed_end = datetime.fromisoformat(end_date).date()
-    except ValueError:
-        raise ValidationError("Invalid date format. Use YYYY-MM-DD")
+    parsed_start, parsed_end = parse_required_date_range_args()
     
     try:
         result = detect_over_allocations(staff_id, parsed_start, parsed_end)
@@ -1846,6 +2355,7 @@ def get_staff_allocation_conflicts(staff_id):
 
 @api.route('/staff/<int:staff_id>/allocation-timeline', methods=['GET'])
 @handle_errors
+@analytics_replica
 def get_staff_allocation_timeline(staff_id):
     """
     Get detailed monthly allocation timeline for a staff member.
@@ -1854,19 +2364,7 @@ def get_staff_allocation_timeline(staff_id):
         start_date (required): Start date (YYYY-MM-DD)
         end_date (required): End date (YYYY-MM-DD)
     """
-    from engine import get_staff_allocation_timeline as get_timeline
-    
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    
-    if not start_date or not end_date:
-        raise ValidationError("start_date and end_date parameters are required")
-    
-    try:
-        parsed_start = datetime.fromisoformat(start_date).date()
-        parsed_end = datetime.fromisoformat(end_date).date()
-    except ValueError:
-        raise ValidationError("Invalid date format. Use YYYY-MM-DD")
+    parsed_start, parsed_end = parse_required_date_range_args()
     
     try:
         result = get_timeline(staff_id, parsed_start, parsed_end)
@@ -1877,6 +2375,8 @@ def get_staff_allocation_timeline(staff_id):
 
 @api.route('/organization/over-allocations', methods=['GET'])
 @handle_errors
+@analytics_replica
+@cached_staffing
 def get_organization_over_allocations_endpoint():
     """
     Get organization-wide over-allocation summary.
@@ -1885,19 +2385,7 @@ def get_organization_over_allocations_endpoint():
         start_date (required): Start date (YYYY-MM-DD)
         end_date (required): End date (YYYY-MM-DD)
     """
-    from engine import get_organization_over_allocations
-    
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    
-    if not start_date or not end_date:
-        raise ValidationError("start_date and end_date parameters are required")
-    
-    try:
-        parsed_start = datetime.fromisoformat(start_date).date()
-        parsed_end = datetime.fromisoformat(end_date).date()
-    except ValueError:
-        raise ValidationError("Invalid date format. Use YYYY-MM-DD")
+    parsed_start, parsed_end = parse_required_date_range_args()
     
     result = get_organization_over_allocations(parsed_start, parsed_end)
     return jsonify(result)
@@ -1916,11 +2404,9 @@ def validate_assignment_allocation_endpoint():
         allocation_percentage (required): Proposed allocation percentage
         exclude_assignment_id (optional): Assignment ID to exclude (for updates)
     """
-    from engine import validate_assignment_allocation
-    
     data = request.get_json()
     
-    validate_required(data, ['staff_id', 'start_date', 'end_date', 'allocation_percentage'])
+    validate_required(data, ('staff_id', 'start_date', 'end_date', 'allocation_percentage'))
     
     try:
         result = validate_assignment_allocation(
@@ -1939,30 +2425,184 @@ def validate_assignment_allocation_endpoint():
 # PLANNING EXERCISE ENDPOINTS
 # =============================================================================
 
+# Bounds concurrent planning engine runs; created on first use from the app config
+_planning_slots = None
+_planning_slots_lock = threading.Lock()
+
+
+@contextmanager
+def planning_slot():
+    """
+    Hold one of PLANNING_MAX_CONCURRENCY slots for an expensive planning engine run.
+
+    Requests beyond the limit queue on the semaphore instead of all hitting the
+    database at once, and give up with a 503 after PLANNING_QUEUE_TIMEOUT seconds.
+    """
+    global _planning_slots
+    if _planning_slots is None:
+        with _planning_slots_lock:
+            if _planning_slots is None:
+                _planning_slots = threading.BoundedSemaphore(current_app.config['PLANNING_MAX_CONCURRENCY'])
+    if not _planning_slots.acquire(timeout=current_app.config['PLANNING_QUEUE_TIMEOUT']):
+        raise ServiceUnavailableError("Planning engine is busy, please retry shortly")
+    try:
+        yield
+    finally:
+        _planning_slots.release()
+
+
 def get_planning_models():
     """Import planning-related models"""
-    from db import db
-    from models import PlanningExercise, PlanningProject, PlanningRole, Role
-    return db, PlanningExercise, PlanningProject, PlanningRole, Role
+    global _planning_models
+    if _planning_models is None:
+        from db import db
+        from models import PlanningExercise, PlanningProject, PlanningRole, Role
+        _planning_models = (db, PlanningExercise, PlanningProject, PlanningRole, Role)
+    return _planning_models
+
+
+# Largest page the planning exercise list returns when paginated
+PLANNING_EXERCISES_MAX_LIMIT = 200
+
+
+def encode_exercise_cursor(exercise):
+    """Encode an exercise's (updated_at, id) position as an opaque page cursor"""
+    position = [exercise.updated_at.replace(tzinfo=None).isoformat(), exercise.id]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_exercise_cursor(cursor):
+    """Decode a page cursor into an (updated_at, id) tuple"""
+    try:
+        updated_at, exercise_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(updated_at), int(exercise_id)
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid cursor")
+
+
+def planning_exercise_load_options(include_projects=True):
+    """Eager-load options for everything PlanningExercise.to_dict touches"""
+    db, PlanningExercise, PlanningProject, PlanningRole, Role = get_planning_models()
+    projects = selectinload(PlanningExercise.planning_projects)
+    if include_projects:
+        projects = projects.selectinload(PlanningProject.planning_roles).joinedload(PlanningRole.role)
+    return [joinedload(PlanningExercise.creator), projects]
+
+
+def load_role_ids(role_ids):
+    """
+    Return which of role_ids exist, checking them all with a single query.
+
+    Loading the roles also puts them in the identity map, so serializing
+    rows that reference them does not query each role again.
+    """
+    db, PlanningExercise, PlanningProject, PlanningRole, Role = get_planning_models()
+    if not role_ids:
+        return set()
+    return {role.id for role in db.session.scalars(select(Role).where(Role.id.in_(role_ids)))}
+
+
+def validate_planning_roles(roles_data):
+    """Validate planning role payloads, so their role_ids can be collected safely"""
+    if not roles_data:
+        return
+    if not isinstance(roles_data, list):
+        raise ValidationError("'roles' must be an array")
+
+    valid_overlap_modes, overlap_mode_error = get_overlap_mode_validation()
+    for role_data in roles_data:
+        if not isinstance(role_data, dict):
+            raise ValidationError("Each role must be an object")
+        validate_required(role_data, ('role_id', 'count'))
+        if not isinstance(role_data['role_id'], int) or isinstance(role_data['role_id'], bool):
+            raise ValidationError("'role_id' must be an integer")
+        overlap_mode = role_data.get('overlap_mode', 'efficient')
+        if not isinstance(overlap_mode, str) or overlap_mode not in valid_overlap_modes:
+            raise ValidationError(overlap_mode_error)
+
+
+def planning_role_rows(roles_data, found_ids=None):
+    """
+    Validate planning role payloads and build insert rows for them.
+
+    found_ids may hold role IDs already checked by load_role_ids for a larger
+    payload whose roles went through validate_planning_roles; otherwise the
+    roles are validated here and the ones referenced checked in one query.
+    Rows leave out planning_project_id, which is filled in on insert.
+    """
+    if not roles_data:
+        return []
+
+    if found_ids is None:
+        validate_planning_roles(roles_data)
+        found_ids = load_role_ids({role_data['role_id'] for role_data in roles_data})
+    for role_data in roles_data:
+        if role_data['role_id'] not in found_ids:
+            raise NotFoundError("Role", role_data['role_id'])
+
+    return [
+        {
+            'role_id': role_data['role_id'],
+            'count': role_data['count'],
+            'start_month_offset': role_data.get('start_month_offset', 0),
+            'end_month_offset': role_data.get('end_month_offset'),
+            'allocation_percentage': role_data.get('allocation_percentage', 100.0),
+            'hours_per_week': role_data.get('hours_per_week', 40.0),
+            'overlap_mode': role_data.get('overlap_mode', 'efficient')
+        }
+        for role_data in roles_data
+    ]
 
 
 @api.route('/planning-exercises', methods=['GET'])
 @handle_errors
+@cached_planning_exercise_list
 def get_planning_exercises():
-    """Get all planning exercises with optional filtering"""
+    """
+    Get all planning exercises with optional filtering.
+
+    With a limit, returns one page of exercises plus a next_cursor to pass
+    back as cursor for the following page (null on the last page).
+    """
     db, PlanningExercise, PlanningProject, PlanningRole, Role = get_planning_models()
     
     status = request.args.get('status')
     include_projects = request.args.get('include_projects', 'true').lower() == 'true'
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    if 'cursor' in request.args and limit is None:
+        raise ValidationError("cursor requires a limit")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValidationError("limit must be an integer")
     
-    query = PlanningExercise.query
+    # Counts, creators and (optionally) projects with their roles load in a
+    # fixed number of queries instead of lazily per exercise
+    query = PlanningExercise.query.options(*planning_exercise_load_options(include_projects))
     
     if status:
         query = query.filter(PlanningExercise.status == status)
     
-    exercises = query.order_by(PlanningExercise.updated_at.desc()).all()
+    if limit is None:
+        exercises = query.order_by(PlanningExercise.updated_at.desc(), PlanningExercise.id.desc()).all()
+        return jsonify([e.to_dict(include_projects=include_projects) for e in exercises])
     
-    return jsonify([e.to_dict(include_projects=include_projects) for e in exercises])
+    if not 1 <= limit <= PLANNING_EXERCISES_MAX_LIMIT:
+        raise ValidationError(f"limit must be between 1 and {PLANNING_EXERCISES_MAX_LIMIT}")
+    
+    # Keyset pagination: continue after the last (updated_at, id) seen, so
+    # every page is an index range scan however deep it is
+    if cursor:
+        query = query.filter(tuple_(PlanningExercise.updated_at, PlanningExercise.id) < decode_exercise_cursor(cursor))
+    exercises = query.order_by(PlanningExercise.updated_at.desc(), PlanningExercise.id.desc()).limit(limit + 1).all()
+    
+    next_cursor = encode_exercise_cursor(exercises[limit - 1]) if len(exercises) > limit else None
+    return jsonify({
+        'exercises': [e.to_dict(include_projects=include_projects) for e in exercises[:limit]],
+        'next_cursor': next_cursor
+    })
 
 
 @api.route('/planning-exercises', methods=['POST'])
@@ -1973,11 +2613,12 @@ def create_planning_exercise():
     
     data = request.get_json()
     
-    validate_required(data, ['name'])
+    validate_required(data, ('name',))
     
     # Validate status if provided
-    if 'status' in data and data['status'] not in PlanningExercise.STATUSES:
-        raise ValidationError(f"Invalid status. Must be one of: {', '.join(PlanningExercise.STATUSES)}")
+    valid_statuses, status_error = get_planning_status_validation()
+    if 'status' in data and (not isinstance(data['status'], str) or data['status'] not in valid_statuses):
+        raise ValidationError(status_error)
     
     exercise = PlanningExercise(
         name=data['name'],
@@ -1986,69 +2627,55 @@ def create_planning_exercise():
         created_by=data.get('created_by')
     )
     
-    safe_db_operation(lambda: (db.session.add(exercise), db.session.commit())[1], "Failed to create planning exercise")
-    
-    # Create projects if provided
+    # Validate projects and roles up front so they can be bulk inserted
+    project_rows = []
+    project_role_rows = []
     if 'projects' in data and data['projects']:
+        if not isinstance(data['projects'], list):
+            raise ValidationError("'projects' must be an array")
+        for project_data in data['projects']:
+            if not isinstance(project_data, dict):
+                raise ValidationError("Each project must be an object")
+            validate_required(project_data, ('name', 'start_date', 'duration_months'))
+            validate_planning_roles(project_data.get('roles'))
+
+        # Check the roles of every project with one query up front
+        found_role_ids = load_role_ids({
+            role_data['role_id']
+            for project_data in data['projects']
+            for role_data in project_data.get('roles') or []
+        })
         for project_data in data['projects']:
-            validate_required(project_data, ['name', 'start_date', 'duration_months'])
-            
             # Parse start date
-            try:
-                start_date = datetime.fromisoformat(project_data['start_date']).date()
-            except ValueError:
-                raise ValidationError(f"Invalid start_date format: {project_data['start_date']}")
-            
-            planning_project = PlanningProject(
-                exercise_id=exercise.id,
-                name=project_data['name'],
-                start_date=start_date,
-                duration_months=project_data['duration_months'],
-                location=project_data.get('location'),
-                budget=project_data.get('budget')
-            )
-            db.session.add(planning_project)
-            db.session.flush()  # Get project ID for roles
+            start_date = parse_date(project_data['start_date'], error_message="Invalid start_date format: {value}")
             
-            # Create roles if provided
-            if 'roles' in project_data and project_data['roles']:
-                for role_data in project_data['roles']:
-                    validate_required(role_data, ['role_id', 'count'])
-                    
-                    # Validate role exists
-                    role = db.session.get(Role, role_data['role_id'])
-                    if not role:
-                        raise NotFoundError("Role", role_data['role_id'])
-                    
-                    # Validate overlap_mode if provided
-                    overlap_mode = role_data.get('overlap_mode', 'efficient')
-                    if overlap_mode not in PlanningRole.OVERLAP_MODES:
-                        raise ValidationError(f"Invalid overlap_mode. Must be one of: {', '.join(PlanningRole.OVERLAP_MODES)}")
-                    
-                    planning_role = PlanningRole(
-                        planning_project_id=planning_project.id,
-                        role_id=role_data['role_id'],
-                        count=role_data['count'],
-                        start_month_offset=role_data.get('start_month_offset', 0),
-                        end_month_offset=role_data.get('end_month_offset'),
-                        allocation_percentage=role_data.get('allocation_percentage', 100.0),
-                        hours_per_week=role_data.get('hours_per_week', 40.0),
-                        overlap_mode=overlap_mode
-                    )
-                    db.session.add(planning_role)
-        
-        safe_db_operation(db.session.commit, "Failed to create planning projects and roles")
+            project_rows.append({
+                'name': project_data['name'],
+                'start_date': start_date,
+                'duration_months': project_data['duration_months'],
+                'location': project_data.get('location'),
+                'budget': project_data.get('budget')
+            })
+            project_role_rows.append(planning_role_rows(project_data.get('roles'), found_role_ids))
+    
+    safe_db_operation(add_planning_exercise_and_commit, "Failed to create planning exercise",
+                      args=(exercise, project_rows, project_role_rows))
+    
+    # Reload the exercise so the response includes the bulk-inserted rows
+    exercise = db.session.get(PlanningExercise, exercise.id, options=planning_exercise_load_options(),
+                              populate_existing=True)
     
     return jsonify(exercise.to_dict(include_projects=True)), 201
 
 
 @api.route('/planning-exercises/<int:exercise_id>', methods=['GET'])
 @handle_errors
+@cached_planning_exercise
 def get_planning_exercise(exercise_id):
     """Get a specific planning exercise by ID"""
     db, PlanningExercise, PlanningProject, PlanningRole, Role = get_planning_models()
     
-    exercise = db.session.get(PlanningExercise, exercise_id)
+    exercise = db.session.get(PlanningExercise, exercise_id, options=planning_exercise_load_options())
     if not exercise:
         raise NotFoundError("PlanningExercise", exercise_id)
     
@@ -2073,8 +2700,9 @@ def update_planning_exercise(exercise_id):
     if 'description' in data:
         exercise.description = data['description']
     if 'status' in data:
-        if data['status'] not in PlanningExercise.STATUSES:
-            raise ValidationError(f"Invalid status. Must be one of: {', '.join(PlanningExercise.STATUSES)}")
+        valid_statuses, status_error = get_planning_status_validation()
+        if not isinstance(data['status'], str) or data['status'] not in valid_statuses:
+            raise ValidationError(status_error)
         exercise.status = data['status']
     
     safe_db_operation(db.session.commit, "Failed to update planning exercise")
@@ -2088,12 +2716,17 @@ def delete_planning_exercise(exercise_id):
     """Delete a planning exercise"""
     db, PlanningExercise, PlanningProject, PlanningRole, Role = get_planning_models()
     
-    exercise = db.session.get(PlanningExercise, exercise_id)
-    if not exercise:
+    # Projects and roles are removed with set-based deletes rather than
+    # loading them for the ORM cascade
+    project_ids = select(PlanningProject.id).where(PlanningProject.exercise_id == exercise_id)
+    deleted_id = safe_db_operation(delete_returning_and_commit, "Failed to delete planning exercise", args=(
+        delete(PlanningExercise).where(PlanningExercise.id == exercise_id).returning(PlanningExercise.id),
+        delete(PlanningRole).where(PlanningRole.planning_project_id.in_(project_ids)),
+        delete(PlanningProject).where(PlanningProject.exercise_id == exercise_id)
+    ))
+    if deleted_id is None:
         raise NotFoundError("PlanningExercise", exercise_id)
     
-    safe_db_operation(lambda: (db.session.delete(exercise), db.session.commit())[1], "Failed to delete planning exercise")
-    
     return jsonify({'message': 'Planning exercise deleted successfully'})
 
 
@@ -2110,51 +2743,25 @@ def create_planning_project(exercise_id):
         raise NotFoundError("PlanningExercise", exercise_id)
     
     data = request.get_json()
-    validate_required(data, ['name', 'start_date', 'duration_months'])
+    validate_required(data, ('name', 'start_date', 'duration_months'))
     
     # Parse start date
-    try:
-        start_date = datetime.fromisoformat(data['start_date']).date()
-    except ValueError:
-        raise ValidationError(f"Invalid start_date format: {data['start_date']}")
-    
-    planning_project = PlanningProject(
-        exercise_id=exercise_id,
-        name=data['name'],
-        start_date=start_date,
-        duration_months=data['duration_months'],
-        location=data.get('location'),
-        budget=data.get('budget')
-    )
-    
-    safe_db_operation(lambda: (db.session.add(planning_project), db.session.commit())[1], "Failed to create planning project")
-    
-    # Create roles if provided
-    if 'roles' in data and data['roles']:
-        for role_data in data['roles']:
-            validate_required(role_data, ['role_id', 'count'])
-            
-            role = db.session.get(Role, role_data['role_id'])
-            if not role:
-                raise NotFoundError("Role", role_data['role_id'])
-            
-            overlap_mode = role_data.get('overlap_mode', 'efficient')
-            if overlap_mode not in PlanningRole.OVERLAP_MODES:
-                raise ValidationError(f"Invalid overlap_mode. Must be one of: {', '.join(PlanningRole.OVERLAP_MODES)}")
-            
-            planning_role = PlanningRole(
-                planning_project_id=planning_project.id,
-                role_id=role_data['role_id'],
-                count=role_data['count'],
-                start_month_offset=role_data.get('start_month_offset', 0),
-                end_month_offset=role_data.get('end_month_offset'),
-                allocation_percentage=role_data.get('allocation_percentage', 100.0),
-                hours_per_week=role_data.get('hours_per_week', 40.0),
-                overlap_mode=overlap_mode
-            )
-            db.session.add(planning_role)
-        
-        safe_db_operation(db.session.commit, "Failed to create planning roles")
+    start_date = parse_date(data['start_date'], error_message="Invalid start_date format: {value}")
+    
+    project_row = {
+        'name': data['name'],
+        'start_date': start_date,
+        'duration_months': data['duration_months'],
+        'location': data.get('location'),
+        'budget': data.get('budget')
+    }
+    role_rows = planning_role_rows(data.get('roles'))
+    
+    project_id = safe_db_operation(insert_planning_project_and_commit, "Failed to create planning project",
+                                   args=(exercise_id, project_row, role_rows))
+    planning_project = db.session.get(PlanningProject, project_id, options=[
+        selectinload(PlanningProject.planning_roles).joinedload(PlanningRole.role)
+    ])
     
     return jsonify(planning_project.to_dict(include_roles=True)), 201
 
@@ -2175,10 +2782,7 @@ def update_planning_project(project_id):
     if 'name' in data:
         planning_project.name = data['name']
     if 'start_date' in data:
-        try:
-            planning_project.start_date = datetime.fromisoformat(data['start_date']).date()
-        except ValueError:
-            raise ValidationError(f"Invalid start_date format: {data['start_date']}")
+        planning_project.start_date = parse_date(data['start_date'], error_message="Invalid start_date format: {value}")
     if 'duration_months' in data:
         planning_project.duration_months = data['duration_months']
     if 'location' in data:
@@ -2197,12 +2801,13 @@ def delete_planning_project(project_id):
     """Delete a planning project"""
     db, PlanningExercise, PlanningProject, PlanningRole, Role = get_planning_models()
     
-    planning_project = db.session.get(PlanningProject, project_id)
-    if not planning_project:
+    deleted_id = safe_db_operation(delete_returning_and_commit, "Failed to delete planning project", args=(
+        delete(PlanningProject).where(PlanningProject.id == project_id).returning(PlanningProject.id),
+        delete(PlanningRole).where(PlanningRole.planning_project_id == project_id)
+    ))
+    if deleted_id is None:
         raise NotFoundError("PlanningProject", project_id)
     
-    safe_db_operation(lambda: (db.session.delete(planning_project), db.session.commit())[1], "Failed to delete planning project")
-    
     return jsonify({'message': 'Planning project deleted successfully'})
 
 
@@ -2219,15 +2824,16 @@ def create_planning_role(project_id):
         raise NotFoundError("PlanningProject", project_id)
     
     data = request.get_json()
-    validate_required(data, ['role_id', 'count'])
+    validate_required(data, ('role_id', 'count'))
     
     role = db.session.get(Role, data['role_id'])
     if not role:
         raise NotFoundError("Role", data['role_id'])
     
     overlap_mode = data.get('overlap_mode', 'efficient')
-    if overlap_mode not in PlanningRole.OVERLAP_MODES:
-        raise ValidationError(f"Invalid overlap_mode. Must be one of: {', '.join(PlanningRole.OVERLAP_MODES)}")
+    valid_overlap_modes, overlap_mode_error = get_overlap_mode_validation()
+    if not isinstance(overlap_mode, str) or overlap_mode not in valid_overlap_modes:
+        raise ValidationError(overlap_mode_error)
     
     planning_role = PlanningRole(
         planning_project_id=project_id,
@@ -2240,7 +2846,7 @@ def create_planning_role(project_id):
         overlap_mode=overlap_mode
     )
     
-    safe_db_operation(lambda: (db.session.add(planning_role), db.session.commit())[1], "Failed to create planning role")
+    safe_db_operation(add_and_commit, "Failed to create planning role", args=(planning_role,))
     
     return jsonify(planning_role.to_dict()), 201
 
@@ -2274,8 +2880,9 @@ def update_planning_role(role_id):
     if 'hours_per_week' in data:
         planning_role.hours_per_week = data['hours_per_week']
     if 'overlap_mode' in data:
-        if data['overlap_mode'] not in PlanningRole.OVERLAP_MODES:
-            raise ValidationError(f"Invalid overlap_mode. Must be one of: {', '.join(PlanningRole.OVERLAP_MODES)}")
+        valid_overlap_modes, overlap_mode_error = get_overlap_mode_validation()
+        if not isinstance(data['overlap_mode'], str) or data['overlap_mode'] not in valid_overlap_modes:
+            raise ValidationError(overlap_mode_error)
         planning_role.overlap_mode = data['overlap_mode']
     
     safe_db_operation(db.session.commit, "Failed to update planning role")
@@ -2289,12 +2896,12 @@ def delete_planning_role(role_id):
     """Delete a planning role"""
     db, PlanningExercise, PlanningProject, PlanningRole, Role = get_planning_models()
     
-    planning_role = db.session.get(PlanningRole, role_id)
-    if not planning_role:
+    deleted_id = safe_db_operation(delete_returning_and_commit, "Failed to delete planning role", args=(
+        delete(PlanningRole).where(PlanningRole.id == role_id).returning(PlanningRole.id),
+    ))
+    if deleted_id is None:
         raise NotFoundError("PlanningRole", role_id)
     
-    safe_db_operation(lambda: (db.session.delete(planning_role), db.session.commit())[1], "Failed to delete planning role")
-    
     return jsonify({'message': 'Planning role deleted successfully'})
 
 
@@ -2302,12 +2909,14 @@ def delete_planning_role(role_id):
 
 @api.route('/planning-exercises/<int:exercise_id>/analysis', methods=['GET'])
 @handle_errors
+@cached_planning_analysis
 def get_planning_analysis(exercise_id):
     """Get full coverage analysis for a planning exercise"""
-    from engine import generate_coverage_analysis
-    
     try:
-        result = generate_coverage_analysis(exercise_id)
+        with planning_slot():
+            result = generate_coverage_analysis(exercise_id)
+        if wants_stream():
+            return stream_json_object(result, ('projects', 'role_coverage'))
         return jsonify(result)
     except ValueError as e:
         raise ValidationError(str(e))
@@ -2315,17 +2924,19 @@ def get_planning_analysis(exercise_id):
 
 @api.route('/planning-exercises/<int:exercise_id>/staff-requirements', methods=['GET'])
 @handle_errors
+@cached_planning_analysis
 def get_planning_staff_requirements(exercise_id):
     """Get minimum staff requirements per role for a planning exercise"""
-    from engine import calculate_minimum_staff_per_role
-    
     overlap_mode = request.args.get('overlap_mode', 'efficient')
     
     if overlap_mode not in ['efficient', 'conservative']:
         raise ValidationError("overlap_mode must be 'efficient' or 'conservative'")
     
     try:
-        result = calculate_minimum_staff_per_role(exercise_id, overlap_mode)
+        with planning_slot():
+            result = calculate_minimum_staff_per_role(exercise_id, overlap_mode)
+        if wants_stream():
+            return stream_json_object(result, ('staff_requirements',))
         return jsonify(result)
     except ValueError as e:
         raise ValidationError(str(e))
@@ -2333,12 +2944,14 @@ def get_planning_staff_requirements(exercise_id):
 
 @api.route('/planning-exercises/<int:exercise_id>/costs', methods=['GET'])
 @handle_errors
+@cached_planning_analysis
 def get_planning_costs(exercise_id):
     """Get cost and margin breakdown for a planning exercise"""
-    from engine import calculate_planning_costs
-    
     try:
-        result = calculate_planning_costs(exercise_id)
+        with planning_slot():
+            result = calculate_planning_costs(exercise_id)
+        if wants_stream():
+            return stream_json_object(result, ('role_costs', 'project_costs'))
         return jsonify(result)
     except ValueError as e:
         raise ValidationError(str(e))
@@ -2353,13 +2966,12 @@ def apply_planning_exercise_endpoint(exercise_id):
     Request Body:
         preview (optional): If true, only return preview without creating (default false)
     """
-    from engine import apply_planning_exercise
-    
     data = request.get_json() or {}
     preview = data.get('preview', False)
     
     try:
-        result = apply_planning_exercise(exercise_id, create_real_projects=not preview)
+        with planning_slot():
+            result = apply_planning_exercise(exercise_id, create_real_projects=not preview)
         return jsonify(result), 201 if not preview else 200
     except ValueError as e:
         raise ValidationError(str(e))
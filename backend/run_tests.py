@@ -6,7 +6,7 @@ Test runner script for HB-Staffing backend
 import sys
 import os
 import subprocess
-import coverage
+import importlib.util
 
 def run_tests():
     """Run all backend tests with coverage"""
@@ -27,12 +27,15 @@ def run_tests():
         "-v"
     ]
 
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
+    # Spread tests across CPU cores when pytest-xdist is installed. Each
+    # worker has its own in-memory database, so tests from the same file can
+    # run on different workers; pytest-cov combines the workers' coverage data
+    if importlib.util.find_spec("xdist") is not None:
+        cmd += ["-n", "auto"]
 
-        print(result.stdout)
-        if result.stderr:
-            print("STDERR:", result.stderr)
+    try:
+        # Output streams straight to the terminal instead of being buffered
+        result = subprocess.run(cmd)
 
         # Print test summary
         print("\n" + "=" * 50)
@@ -50,22 +53,18 @@ def run_tests():
     return True
 
 def run_specific_test(test_path):
-    """Run a specific test"""
+    """Run a specific test without coverage, replacing this process with pytest"""
     backend_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(backend_dir)
 
-    cmd = [sys.executable, "-m", "pytest", test_path, "-v"]
-    result = subprocess.run(cmd)
-
-    return result.returncode == 0
+    cmd = [sys.executable, "-m", "pytest", test_path, "-v", "--no-cov"]
+    os.execv(sys.executable, cmd)
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
-        # Run specific test
-        test_path = sys.argv[1]
-        success = run_specific_test(test_path)
-    else:
-        # Run all tests
-        success = run_tests()
+        # Run specific test (does not return)
+        run_specific_test(sys.argv[1])
 
+    # Run all tests
+    success = run_tests()
     sys.exit(0 if success else 1)
@@ -3,10 +3,8 @@ Unit tests for HB-Staffing forecasting engine
 """
 
 import pytest
+from sqlalchemy import insert
 from datetime import date, datetime
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from engine import (
     calculate_project_staffing_needs,
@@ -24,118 +22,137 @@ from engine import (
     get_organization_over_allocations,
     generate_coverage_analysis,
     calculate_minimum_staff_per_role,
-    calculate_planning_costs
+    calculate_planning_costs,
+    to_date,
+    month_start_from_key
 )
 from app import create_app
 from models import db, Staff, Project, Assignment, Role, PlanningExercise, PlanningProject, PlanningRole
 
+# Canonical periods shared by the fixtures and tests
+YEAR_START = date(2024, 1, 1)
+MID_YEAR = date(2024, 6, 30)
+YEAR_END = date(2024, 12, 31)
+NEXT_YEAR_START = date(2025, 1, 1)
+NEXT_MID_YEAR = date(2025, 6, 30)
+FULL_YEAR = (YEAR_START, YEAR_END)
+HALF_YEAR = (YEAR_START, MID_YEAR)
 
-@pytest.fixture
-def app():
-    """Create and configure a test app instance."""
-    app = create_app('testing')
-    with app.app_context():
-        db.create_all()
-        yield app
-        db.session.remove()
-        db.drop_all()
-
-
-@pytest.fixture
-def test_data(app):
-    """Create test data for forecasting tests. Returns IDs to avoid detached session issues."""
-    with app.app_context():
-        # Use existing roles from seeded database or create unique ones
-        # Check for existing roles first
-        existing_roles = Role.query.all()
-        
-        if len(existing_roles) >= 4:
-            # Use existing roles
-            role_ids = [r.id for r in existing_roles[:4]]
-        else:
-            # Create roles with unique names for tests
-            roles_data = [
-                {'name': 'Test Manager', 'hourly_cost': 80.0, 'default_billable_rate': 150.0},
-                {'name': 'Test Estimator', 'hourly_cost': 60.0, 'default_billable_rate': 120.0},
-                {'name': 'Test Laborer', 'hourly_cost': 35.0, 'default_billable_rate': 70.0},
-                {'name': 'Test Supervisor', 'hourly_cost': 55.0, 'default_billable_rate': 110.0}
-            ]
-            
-            role_ids = []
-            for data in roles_data:
-                # Check if already exists
-                existing = Role.query.filter_by(name=data['name']).first()
-                if existing:
-                    role_ids.append(existing.id)
-                else:
-                    role = Role(**data)
-                    db.session.add(role)
-                    db.session.flush()  # Get the ID
-                    role_ids.append(role.id)
-            db.session.commit()
-        
-        # Create test staff with different roles and rates
-        # Note: default_billable_rate comes from the role, not the Staff model
-        staff_data = [
-            {'name': 'Test PM', 'role_id': role_ids[0], 'internal_hourly_cost': 80.0},
-            {'name': 'Test Senior Estimator', 'role_id': role_ids[1], 'internal_hourly_cost': 70.0},
-            {'name': 'Test Junior Estimator', 'role_id': role_ids[1], 'internal_hourly_cost': 50.0},
-            {'name': 'Test Laborer', 'role_id': role_ids[2], 'internal_hourly_cost': 35.0},
-            {'name': 'Test Foreman', 'role_id': role_ids[3], 'internal_hourly_cost': 55.0},
-            {'name': 'Test Available Estimator', 'role_id': role_ids[1], 'internal_hourly_cost': 55.0}
-        ]
+# Every test runs in a SAVEPOINT rolled back afterwards (see conftest)
+pytestmark = pytest.mark.usefixtures('db_transaction')
 
-        staff_ids = []
-        for data in staff_data:
-            staff = Staff(**data)
-            db.session.add(staff)
-            db.session.flush()  # Get the ID
-            staff_ids.append(staff.id)
-
-        # Create test project
-        project = Project(
-            name="Test Large Construction Project",
-            start_date=date(2024, 1, 1),
-            end_date=date(2024, 12, 31),
-            status="active",
-            budget=2000000.0
-        )
-        db.session.add(project)
-        db.session.flush()  # Get the ID
-        project_id = project.id
-        
-        db.session.commit()
-
-        # Create assignments spanning different periods
-        assignments_data = [
-            # Project Manager - full year
-            {'staff_id': staff_ids[0], 'start_date': date(2024, 1, 1), 'end_date': date(2024, 12, 31), 'hours_per_week': 45.0, 'allocation_type': 'full'},
-            # Senior Estimator - first half
-            {'staff_id': staff_ids[1], 'start_date': date(2024, 1, 1), 'end_date': date(2024, 6, 30), 'hours_per_week': 40.0, 'allocation_type': 'full'},
-            # Junior Estimator - second half
-            {'staff_id': staff_ids[2], 'start_date': date(2024, 7, 1), 'end_date': date(2024, 12, 31), 'hours_per_week': 40.0, 'allocation_type': 'full'},
-            # Laborers - peak periods
-            {'staff_id': staff_ids[3], 'start_date': date(2024, 3, 1), 'end_date': date(2024, 8, 31), 'hours_per_week': 40.0, 'allocation_type': 'full'},
-            # Foreman - full year
-            {'staff_id': staff_ids[4], 'start_date': date(2024, 1, 1), 'end_date': date(2024, 12, 31), 'hours_per_week': 50.0, 'allocation_type': 'full'}
-        ]
-
-        for assign_data in assignments_data:
-            assignment = Assignment(
-                project_id=project_id,
-                **assign_data
-            )
-            db.session.add(assignment)
 
-        db.session.commit()
+@pytest.fixture(scope='module')
+def app():
+    """Create the test app and its schema once for this module's tests.
 
-        # Return IDs instead of objects to avoid detached session issues
-        return {
-            'staff_ids': staff_ids,
-            'role_ids': role_ids,
-            'project_id': project_id,
-            'assignments': assignments_data
+    A single app context stays pushed for the module, so tests call the
+    engine directly without entering their own.
+    """
+    app = create_app('testing')
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+    yield app
+    # The in-memory database goes away with the engine; no drop_all needed
+    db.session.remove()
+    ctx.pop()
+
+
+@pytest.fixture(scope='module')
+def test_data(app, db_connection):
+    """Create test data for forecasting tests once per module. Returns IDs to avoid detached session issues."""
+    # Dedicated test roles, so results don't depend on the seeded roles' staff
+    roles_data = [
+        {'name': 'Test Manager', 'hourly_cost': 80.0, 'default_billable_rate': 150.0},
+        {'name': 'Test Estimator', 'hourly_cost': 60.0, 'default_billable_rate': 120.0},
+        {'name': 'Test Laborer', 'hourly_cost': 35.0, 'default_billable_rate': 70.0},
+        {'name': 'Test Supervisor', 'hourly_cost': 55.0, 'default_billable_rate': 110.0}
+    ]
+    role_ids = db.session.scalars(
+        insert(Role).returning(Role.id, sort_by_parameter_order=True), roles_data
+    ).all()
+
+    # Create test staff with different roles and rates
+    # Note: default_billable_rate comes from the role, not the Staff model
+    staff_data = [
+        {'name': 'Test PM', 'role_id': role_ids[0], 'internal_hourly_cost': 80.0},
+        {'name': 'Test Senior Estimator', 'role_id': role_ids[1], 'internal_hourly_cost': 70.0},
+        {'name': 'Test Junior Estimator', 'role_id': role_ids[1], 'internal_hourly_cost': 50.0},
+        {'name': 'Test Laborer', 'role_id': role_ids[2], 'internal_hourly_cost': 35.0},
+        {'name': 'Test Foreman', 'role_id': role_ids[3], 'internal_hourly_cost': 55.0},
+        {'name': 'Test Available Estimator', 'role_id': role_ids[1], 'internal_hourly_cost': 55.0}
+    ]
+
+    # One executemany INSERT; RETURNING keeps the ids in row order
+    staff_ids = db.session.scalars(
+        insert(Staff).returning(Staff.id, sort_by_parameter_order=True),
+        staff_data
+    ).all()
+
+    # Create test project
+    project_id = db.session.scalar(
+        insert(Project).returning(Project.id),
+        {
+            'name': "Test Large Construction Project",
+            'start_date': YEAR_START,
+            'end_date': YEAR_END,
+            'status': "active",
+            'budget': 2000000.0
         }
+    )
+
+    # Create assignments spanning different periods
+    assignments_data = [
+        # Project Manager - full year
+        {'staff_id': staff_ids[0], 'start_date': YEAR_START, 'end_date': YEAR_END, 'hours_per_week': 45.0, 'allocation_type': 'full'},
+        # Senior Estimator - first half
+        {'staff_id': staff_ids[1], 'start_date': YEAR_START, 'end_date': MID_YEAR, 'hours_per_week': 40.0, 'allocation_type': 'full'},
+        # Junior Estimator - second half
+        {'staff_id': staff_ids[2], 'start_date': date(2024, 7, 1), 'end_date': YEAR_END, 'hours_per_week': 40.0, 'allocation_type': 'full'},
+        # Laborers - peak periods
+        {'staff_id': staff_ids[3], 'start_date': date(2024, 3, 1), 'end_date': date(2024, 8, 31), 'hours_per_week': 40.0, 'allocation_type': 'full'},
+        # Foreman - full year
+        {'staff_id': staff_ids[4], 'start_date': YEAR_START, 'end_date': YEAR_END, 'hours_per_week': 50.0, 'allocation_type': 'full'}
+    ]
+
+    db.session.execute(
+        insert(Assignment),
+        [{**assign_data, 'project_id': project_id} for assign_data in assignments_data]
+    )
+    db.session.commit()
+
+    # Return IDs instead of objects to avoid detached session issues
+    return {
+        'staff_ids': staff_ids,
+        'role_ids': role_ids,
+        'project_id': project_id,
+        'assignments': assignments_data,
+        # Named ids for the rows individual tests single out
+        'pm_id': staff_ids[0],
+        'junior_estimator_id': staff_ids[2],
+        'available_estimator_id': staff_ids[5],
+        'manager_role_id': role_ids[0],
+        'estimator_role_id': role_ids[1]
+    }
+
+
+class TestDateHelpers:
+    """Test date parsing helpers"""
+
+    def test_to_date(self):
+        """Test ISO strings are parsed and dates pass through"""
+        assert to_date('2024-03-15') == date(2024, 3, 15)
+        assert to_date('2024-03-15T10:30:00') == date(2024, 3, 15)
+        assert to_date(date(2024, 3, 15)) == date(2024, 3, 15)
+        assert to_date(None) is None
+        with pytest.raises(ValueError):
+            to_date('not-a-date')
+
+    def test_month_start_from_key(self):
+        """Test month keys map to the first day of the month"""
+        assert month_start_from_key('2024-02') == date(2024, 2, 1)
+        assert month_start_from_key('2024-12') == date(2024, 12, 1)
 
 
 class TestProjectStaffingNeeds:
@@ -143,59 +160,56 @@ class TestProjectStaffingNeeds:
 
     def test_calculate_staffing_needs_full_year(self, app, test_data):
         """Test calculating staffing needs for full project year"""
-        with app.app_context():
-            project_id = test_data['project_id']
+        project_id = test_data['project_id']
 
-            result = calculate_project_staffing_needs(
-                project_id,
-                date(2024, 1, 1),
-                date(2024, 12, 31)
-            )
+        result = calculate_project_staffing_needs(
+            project_id,
+            YEAR_START,
+            YEAR_END
+        )
 
-            # Check expected keys in result
-            assert 'project_id' in result
-            assert 'project_name' in result
-            assert 'forecast_period' in result
-            assert 'weekly_staffing' in result
-            assert 'staff_breakdown' in result
-            assert 'total_estimated_cost' in result
-            assert 'assignments_count' in result
+        # Check expected keys in result
+        assert 'project_id' in result
+        assert 'project_name' in result
+        assert 'forecast_period' in result
+        assert 'weekly_staffing' in result
+        assert 'staff_breakdown' in result
+        assert 'total_estimated_cost' in result
+        assert 'assignments_count' in result
 
-            # Check that we have staffing data
-            assert len(result['weekly_staffing']) > 0
-            assert result['assignments_count'] > 0
+        # Check that we have staffing data
+        assert len(result['weekly_staffing']) > 0
+        assert result['assignments_count'] > 0
 
     def test_calculate_staffing_needs_partial_period(self, app, test_data):
         """Test calculating staffing needs for partial period"""
-        with app.app_context():
-            project_id = test_data['project_id']
+        project_id = test_data['project_id']
 
-            result = calculate_project_staffing_needs(
-                project_id,
-                date(2024, 1, 1),
-                date(2024, 6, 30)
-            )
+        result = calculate_project_staffing_needs(
+            project_id,
+            YEAR_START,
+            MID_YEAR
+        )
 
-            # Half year should have roughly 26 weeks of data
-            assert len(result['weekly_staffing']) <= 30  # Allow some margin for week alignment
+        # Half year should have roughly 26 weeks of data
+        assert len(result['weekly_staffing']) <= 30  # Allow some margin for week alignment
 
     def test_calculate_staffing_needs_no_assignments(self, app):
         """Test calculating staffing needs for project with no assignments"""
-        with app.app_context():
-            # Create project with dates but no assignments
-            project = Project(
-                name="Empty Project",
-                status="planning",
-                start_date=date(2024, 1, 1),
-                end_date=date(2024, 12, 31)
-            )
-            db.session.add(project)
-            db.session.commit()
+        # Create project with dates but no assignments
+        project = Project(
+            name="Empty Project",
+            status="planning",
+            start_date=YEAR_START,
+            end_date=YEAR_END
+        )
+        db.session.add(project)
+        db.session.commit()
 
-            result = calculate_project_staffing_needs(project.id)
+        result = calculate_project_staffing_needs(project.id)
 
-            assert result['assignments_count'] == 0
-            assert result['total_estimated_cost'] == 0
+        assert result['assignments_count'] == 0
+        assert result['total_estimated_cost'] == 0
 
 
 class TestProjectCost:
@@ -203,57 +217,63 @@ class TestProjectCost:
 
     def test_calculate_project_cost(self, app, test_data):
         """Test calculating total project cost"""
-        with app.app_context():
-            project_id = test_data['project_id']
+        project_id = test_data['project_id']
 
-            result = calculate_project_cost(project_id)
+        result = calculate_project_cost(project_id)
 
-            # Check expected keys
-            assert 'project_id' in result
-            assert 'project_name' in result
-            assert 'total_cost' in result
-            assert 'staff_costs' in result
-            assert 'assignments_count' in result
-            assert 'budget' in result
-            assert 'budget_variance' in result
-
-            # Check that costs are calculated
-            assert result['total_cost'] >= 0
-            assert isinstance(result['staff_costs'], dict)
+        # Check expected keys
+        assert 'project_id' in result
+        assert 'project_name' in result
+        assert 'total_cost' in result
+        assert 'staff_costs' in result
+        assert 'assignments_count' in result
+        assert 'budget' in result
+        assert 'budget_variance' in result
+
+        # Check that costs are calculated
+        assert result['total_cost'] >= 0
+        assert isinstance(result['staff_costs'], dict)
 
     def test_cost_breakdown_by_staff(self, app, test_data):
         """Test cost breakdown by individual staff members"""
-        with app.app_context():
-            project_id = test_data['project_id']
+        project_id = test_data['project_id']
 
-            result = calculate_project_cost(project_id)
+        result = calculate_project_cost(project_id)
 
-            # Should have cost data for assigned staff members
-            staff_costs = result['staff_costs']
-            assert isinstance(staff_costs, dict)
+        # Should have cost data for assigned staff members
+        staff_costs = result['staff_costs']
+        assert isinstance(staff_costs, dict)
 
     def test_project_with_no_assignments_cost(self, app):
         """Test cost calculation for project with no assignments"""
-        with app.app_context():
-            project = Project(name="Costless Project", status="planning")
-            db.session.add(project)
-            db.session.commit()
+        project = Project(name="Costless Project", status="planning")
+        db.session.add(project)
+        db.session.commit()
 
-            result = calculate_project_cost(project.id)
+        result = calculate_project_cost(project.id)
 
-            assert result['total_cost'] == 0
-            assert len(result['staff_costs']) == 0
+        assert result['total_cost'] == 0
+        assert len(result['staff_costs']) == 0
 
 
 class TestOrganizationForecast:
     """Test organization-wide forecasting"""
 
-    def test_calculate_organization_forecast(self, app, test_data):
+    @pytest.fixture(scope='class')
+    def forecast_for(self, app, test_data):
+        """Organization forecast per period, computed at most once for the class"""
+        cache = {}
+
+        def forecast_for(start_date, end_date):
+            if (start_date, end_date) not in cache:
+                cache[start_date, end_date] = calculate_organization_forecast(start_date, end_date)
+            return cache[start_date, end_date]
+
+        return forecast_for
+
+    def test_calculate_organization_forecast(self, forecast_for):
         """Test calculating organization-wide forecast"""
-        result = calculate_organization_forecast(
-            date(2024, 1, 1),
-            date(2024, 12, 31)
-        )
+        result = forecast_for(YEAR_START, YEAR_END)
 
         # Check expected keys
         assert 'forecast_period' in result
@@ -267,13 +287,10 @@ class TestOrganizationForecast:
         assert result['projects_count'] >= 1
         assert len(result['project_forecasts']) >= 1
 
-    def test_organization_forecast_date_range(self, app, test_data):
+    def test_organization_forecast_date_range(self, forecast_for):
         """Test organization forecast respects date range"""
         # Test with shorter date range
-        result = calculate_organization_forecast(
-            date(2024, 1, 1),
-            date(2024, 6, 30)
-        )
+        result = forecast_for(YEAR_START, MID_YEAR)
 
         # Should have staff utilization data
         assert len(result['staff_utilization']) >= 1
@@ -284,150 +301,121 @@ class TestScenarioSimulation:
 
     def test_simulate_scenario_add_assignment(self, app, test_data):
         """Test simulating addition of assignment"""
-        with app.app_context():
-            project_id = test_data['project_id']
-            staff_id = test_data['staff_ids'][2]  # Junior Estimator
-
-            changes = {
-                'add_assignments': [
-                    {
-                        'staff_id': staff_id,
-                        'start_date': '2024-01-01',
-                        'end_date': '2024-06-30',
-                        'hours_per_week': 20.0,
-                        'role_on_project': 'Additional Support'
-                    }
-                ]
-            }
-
-            result = simulate_scenario(project_id, changes)
-
-            assert 'current_forecast' in result
-            assert 'simulated_forecast' in result
-            assert 'changes_applied' in result
-            assert 'impact_analysis' in result
-
-            # Simulated forecast should have more assignments
-            assert result['simulated_forecast']['assignments_count'] > result['current_forecast']['assignments_count']
+        project_id = test_data['project_id']
+        staff_id = test_data['junior_estimator_id']
+
+        changes = {
+            'add_assignments': [
+                {
+                    'staff_id': staff_id,
+                    'start_date': '2024-01-01',
+                    'end_date': '2024-06-30',
+                    'hours_per_week': 20.0,
+                    'role_on_project': 'Additional Support'
+                }
+            ]
+        }
+
+        result = simulate_scenario(project_id, changes)
+
+        assert 'current_forecast' in result
+        assert 'simulated_forecast' in result
+        assert 'changes_applied' in result
+        assert 'impact_analysis' in result
+
+        # Simulated forecast should have more assignments
+        assert result['simulated_forecast']['assignments_count'] > result['current_forecast']['assignments_count']
 
     def test_simulate_scenario_extend_dates(self, app, test_data):
         """Test simulating project extension"""
-        with app.app_context():
-            project_id = test_data['project_id']
+        project_id = test_data['project_id']
 
-            changes = {
-                'extend_dates': {'end_date': '2025-06-30'}  # Extend by 6 months
-            }
+        changes = {
+            'extend_dates': {'end_date': '2025-06-30'}  # Extend by 6 months
+        }
 
-            result = simulate_scenario(project_id, changes)
+        result = simulate_scenario(project_id, changes)
 
-            # Extended project should have longer duration
-            orig_end = result['current_forecast']['forecast_period']['end_date']
-            sim_end = result['simulated_forecast']['forecast_period']['end_date']
-            assert sim_end > orig_end
+        # Extended project should have longer duration
+        orig_end = result['current_forecast']['forecast_period']['end_date']
+        sim_end = result['simulated_forecast']['forecast_period']['end_date']
+        assert sim_end > orig_end
 
     def test_simulate_scenario_invalid_project(self, app):
         """Test simulation with invalid project ID"""
-        with app.app_context():
-            with pytest.raises(ValueError) as exc_info:
-                simulate_scenario(99999, {})
+        with pytest.raises(ValueError) as exc_info:
+            simulate_scenario(99999, {})
 
-            assert 'not found' in str(exc_info.value).lower()
+        assert 'not found' in str(exc_info.value).lower()
 
 
 class TestStaffingGaps:
     """Test staffing gap detection"""
 
-    def test_detect_staffing_gaps_no_gaps(self, app, test_data):
-        """Test gap detection when staffing is adequate"""
-        with app.app_context():
-            project_id = test_data['project_id']
-
-            gaps = detect_staffing_gaps(project_id, date(2024, 1, 1), date(2024, 12, 31))
-
-            # Our test data should have adequate staffing
-            assert isinstance(gaps, list)
+    @pytest.mark.parametrize('for_project,start_date,end_date', [
+        (True, *FULL_YEAR),   # adequately staffed project
+        (True, *HALF_YEAR),   # project, partial period
+        (False, *FULL_YEAR),  # all projects
+    ], ids=['no_gaps', 'with_project_filter', 'all_projects'])
+    def test_detect_staffing_gaps(self, app, test_data, for_project, start_date, end_date):
+        """Test gap detection for a project or across all projects"""
+        project_id = test_data['project_id'] if for_project else None
 
-    def test_detect_staffing_gaps_with_project_filter(self, app, test_data):
-        """Test gap detection for specific project"""
-        with app.app_context():
-            project_id = test_data['project_id']
+        gaps = detect_staffing_gaps(project_id, start_date, end_date)
 
-            gaps = detect_staffing_gaps(project_id, date(2024, 1, 1), date(2024, 6, 30))
-
-            assert isinstance(gaps, list)
-
-    def test_detect_staffing_gaps_all_projects(self, app, test_data):
-        """Test gap detection across all projects"""
-        with app.app_context():
-            gaps = detect_staffing_gaps(None, date(2024, 1, 1), date(2024, 12, 31))
-
-            assert isinstance(gaps, list)
+        assert isinstance(gaps, list)
 
 
 class TestCapacityAnalysis:
     """Test capacity analysis functionality"""
 
-    def test_calculate_capacity_analysis(self, app, test_data):
-        """Test capacity analysis for staff member"""
-        with app.app_context():
-            staff_id = test_data['staff_ids'][0]  # Project Manager
+    @pytest.fixture(scope='class')
+    def capacity_results(self, app, test_data):
+        """Capacity analysis for the Project Manager, computed once per date range"""
+        staff_id = test_data['pm_id']
+        return {
+            period: calculate_capacity_analysis(staff_id, *period)
+            for period in (HALF_YEAR, FULL_YEAR)
+        }
 
-            result = calculate_capacity_analysis(
-                staff_id,
-                date(2024, 1, 1),
-                date(2024, 12, 31)
-            )
+    @pytest.mark.parametrize('period', [HALF_YEAR, FULL_YEAR], ids=['half_year', 'full_year'])
+    def test_calculate_capacity_analysis(self, capacity_results, period):
+        """Test capacity analysis for staff member"""
+        result = capacity_results[period]
 
-            # Check expected keys
-            assert 'staff_id' in result
-            assert 'staff_name' in result
-            assert 'role' in result
-            assert 'assigned_hours' in result
-            assert 'available_hours' in result
-            assert 'utilization_rate' in result
-            assert 'overallocated' in result
+        # Check expected keys
+        assert 'staff_id' in result
+        assert 'staff_name' in result
+        assert 'role' in result
+        assert 'assigned_hours' in result
+        assert 'available_hours' in result
+        assert 'utilization_rate' in result
+        assert 'overallocated' in result
 
-            # Utilization should be between 0 and a reasonable max (could be > 1 if overallocated)
-            assert result['utilization_rate'] >= 0
+        # Utilization should be between 0 and a reasonable max (could be > 1 if overallocated)
+        assert result['utilization_rate'] >= 0
 
     def test_capacity_analysis_all_staff(self, app, test_data):
         """Test capacity analysis for all staff"""
-        with app.app_context():
-            result = calculate_capacity_analysis(
-                None,  # All staff
-                date(2024, 1, 1),
-                date(2024, 12, 31)
-            )
+        result = calculate_capacity_analysis(
+            None,  # All staff
+            YEAR_START,
+            YEAR_END
+        )
 
-            # Returns a dict mapping staff_id to their analysis
-            assert isinstance(result, dict)
-            assert len(result) >= len(test_data['staff_ids'])
+        # Returns a dict mapping staff_id to their analysis
+        assert isinstance(result, dict)
+        assert len(result) >= len(test_data['staff_ids'])
 
-            for staff_id, staff_analysis in result.items():
-                assert 'staff_name' in staff_analysis
-                assert 'utilization_rate' in staff_analysis
+        for staff_id, staff_analysis in result.items():
+            assert 'staff_name' in staff_analysis
+            assert 'utilization_rate' in staff_analysis
 
-    def test_capacity_analysis_date_range(self, app, test_data):
+    def test_capacity_analysis_date_range(self, capacity_results):
         """Test capacity analysis respects date range"""
-        with app.app_context():
-            staff_id = test_data['staff_ids'][0]
-
-            # Test with shorter date range
-            result_short = calculate_capacity_analysis(
-                staff_id,
-                date(2024, 1, 1),
-                date(2024, 6, 30)
-            )
-
-            result_long = calculate_capacity_analysis(
-                staff_id,
-                date(2024, 1, 1),
-                date(2024, 12, 31)
-            )
-
-            # Longer period should have more available hours
-            assert result_long['available_hours'] > result_short['available_hours']
+        # Longer period should have more available hours
+        assert (capacity_results[FULL_YEAR]['available_hours'] >
+                capacity_results[HALF_YEAR]['available_hours'])
 
 
 class TestEdgeCases:
@@ -435,14 +423,13 @@ class TestEdgeCases:
 
     def test_forecast_with_missing_project_dates(self, app):
         """Test forecasting when project has no dates set"""
-        with app.app_context():
-            project = Project(name="No Dates Project", status="planning")
-            db.session.add(project)
-            db.session.commit()
+        project = Project(name="No Dates Project", status="planning")
+        db.session.add(project)
+        db.session.commit()
 
-            # Should raise ValueError since dates are required
-            with pytest.raises(ValueError):
-                calculate_project_staffing_needs(project.id, None, None)
+        # Should raise ValueError since dates are required
+        with pytest.raises(ValueError):
+            calculate_project_staffing_needs(project.id, None, None)
 
     def test_cost_calculation_project_not_found(self, app):
         """Test cost calculation for non-existent project"""
@@ -457,43 +444,40 @@ class TestStaffAvailabilityForecast:
     
     def test_get_staff_availability_all_roles(self, app, test_data):
         """Test getting staff availability without role filter"""
-        with app.app_context():
-            result = get_staff_availability_forecast(
-                start_date=date(2025, 1, 1),
-                end_date=date(2025, 6, 30)
-            )
+        result = get_staff_availability_forecast(
+            start_date=NEXT_YEAR_START,
+            end_date=NEXT_MID_YEAR
+        )
             
-            assert 'period' in result
-            assert 'available' in result
-            assert 'partially_available' in result
-            assert 'unavailable' in result
-            assert 'summary' in result
-            assert result['summary']['total_staff'] >= 1
+        assert 'period' in result
+        assert 'available' in result
+        assert 'partially_available' in result
+        assert 'unavailable' in result
+        assert 'summary' in result
+        assert result['summary']['total_staff'] >= 1
     
     def test_get_staff_availability_by_role(self, app, test_data):
         """Test getting staff availability filtered by role"""
-        with app.app_context():
-            role_id = test_data['role_ids'][1]  # Estimator role
+        role_id = test_data['estimator_role_id']
             
-            result = get_staff_availability_forecast(
-                role_id=role_id,
-                start_date=date(2025, 1, 1),
-                end_date=date(2025, 6, 30)
-            )
+        result = get_staff_availability_forecast(
+            role_id=role_id,
+            start_date=NEXT_YEAR_START,
+            end_date=NEXT_MID_YEAR
+        )
             
-            assert result['role'] is not None
-            assert result['role']['id'] == role_id
+        assert result['role'] is not None
+        assert result['role']['id'] == role_id
     
     def test_staff_availability_during_assignment(self, app, test_data):
         """Test availability during assigned period"""
-        with app.app_context():
-            result = get_staff_availability_forecast(
-                start_date=date(2024, 3, 1),
-                end_date=date(2024, 6, 30)
-            )
+        result = get_staff_availability_forecast(
+            start_date=date(2024, 3, 1),
+            end_date=MID_YEAR
+        )
             
-            # Some staff should be unavailable during this period
-            assert result['summary']['unavailable_count'] >= 0 or result['summary']['partial_count'] >= 0
+        # Some staff should be unavailable during this period
+        assert result['summary']['unavailable_count'] >= 0 or result['summary']['partial_count'] >= 0
 
 
 class TestStaffSuggestions:
@@ -501,48 +485,45 @@ class TestStaffSuggestions:
     
     def test_suggest_staff_for_role(self, app, test_data):
         """Test getting staff suggestions for a role"""
-        with app.app_context():
-            role_id = test_data['role_ids'][1]  # Estimator role
+        role_id = test_data['estimator_role_id']
             
-            result = suggest_staff_for_role(
-                role_id=role_id,
-                start_date=date(2025, 1, 1),
-                end_date=date(2025, 6, 30),
-                allocation_percentage=100.0
-            )
+        result = suggest_staff_for_role(
+            role_id=role_id,
+            start_date=NEXT_YEAR_START,
+            end_date=NEXT_MID_YEAR,
+            allocation_percentage=100.0
+        )
             
-            assert 'role' in result
-            assert 'period' in result
-            assert 'suggestions' in result
-            assert 'total_candidates' in result
-            assert 'qualified_candidates' in result
+        assert 'role' in result
+        assert 'period' in result
+        assert 'suggestions' in result
+        assert 'total_candidates' in result
+        assert 'qualified_candidates' in result
         
     def test_suggestions_have_match_scores(self, app, test_data):
         """Test that suggestions include match scores"""
-        with app.app_context():
-            role_id = test_data['role_ids'][1]
+        role_id = test_data['estimator_role_id']
             
-            result = suggest_staff_for_role(
-                role_id=role_id,
-                start_date=date(2025, 1, 1),
-                end_date=date(2025, 6, 30)
-            )
+        result = suggest_staff_for_role(
+            role_id=role_id,
+            start_date=NEXT_YEAR_START,
+            end_date=NEXT_MID_YEAR
+        )
             
-            if result['suggestions']:
-                for suggestion in result['suggestions']:
-                    assert 'match_score' in suggestion
-                    assert 'match_reasons' in suggestion
-                    assert suggestion['match_score'] >= 0
+        if result['suggestions']:
+            for suggestion in result['suggestions']:
+                assert 'match_score' in suggestion
+                assert 'match_reasons' in suggestion
+                assert suggestion['match_score'] >= 0
     
-    def test_suggest_staff_invalid_role(self, app, test_data):
+    def test_suggest_staff_invalid_role(self, app):
         """Test suggestion with invalid role"""
-        with app.app_context():
-            with pytest.raises(ValueError):
-                suggest_staff_for_role(
-                    role_id=99999,
-                    start_date=date(2025, 1, 1),
-                    end_date=date(2025, 6, 30)
-                )
+        with pytest.raises(ValueError):
+            suggest_staff_for_role(
+                role_id=99999,
+                start_date=NEXT_YEAR_START,
+                end_date=NEXT_MID_YEAR
+            )
 
 
 class TestNewHireNeeds:
@@ -550,35 +531,33 @@ class TestNewHireNeeds:
     
     def test_flag_new_hire_needs_sufficient_staff(self, app, test_data):
         """Test when sufficient staff are available"""
-        with app.app_context():
-            role_id = test_data['role_ids'][1]  # Estimator role
+        role_id = test_data['estimator_role_id']
             
-            result = flag_new_hire_needs(
-                role_id=role_id,
-                start_date=date(2025, 7, 1),
-                end_date=date(2025, 12, 31),
-                required_count=1
-            )
+        result = flag_new_hire_needs(
+            role_id=role_id,
+            start_date=date(2025, 7, 1),
+            end_date=date(2025, 12, 31),
+            required_count=1
+        )
             
-            assert 'needs_new_hire' in result
-            assert 'new_hire_count' in result
-            assert 'recommendations' in result
-            assert 'availability' in result
+        assert 'needs_new_hire' in result
+        assert 'new_hire_count' in result
+        assert 'recommendations' in result
+        assert 'availability' in result
     
     def test_flag_new_hire_needs_insufficient_staff(self, app, test_data):
         """Test when more staff are needed than available"""
-        with app.app_context():
-            role_id = test_data['role_ids'][0]  # Manager role
+        role_id = test_data['manager_role_id']
             
-            result = flag_new_hire_needs(
-                role_id=role_id,
-                start_date=date(2024, 1, 1),
-                end_date=date(2024, 6, 30),
-                required_count=5  # Need more than available
-            )
+        result = flag_new_hire_needs(
+            role_id=role_id,
+            start_date=YEAR_START,
+            end_date=MID_YEAR,
+            required_count=5  # Need more than available
+        )
             
-            assert result['needs_new_hire'] == True
-            assert result['new_hire_count'] > 0
+        assert result['needs_new_hire'] == True
+        assert result['new_hire_count'] > 0
 
 
 class TestOverAllocationDetection:
@@ -586,181 +565,165 @@ class TestOverAllocationDetection:
     
     def test_detect_over_allocations_no_conflicts(self, app, test_data):
         """Test detection when no over-allocations exist"""
-        with app.app_context():
-            staff_id = test_data['staff_ids'][5]  # Available Estimator (no assignments)
+        staff_id = test_data['available_estimator_id']  # No assignments
             
-            result = detect_over_allocations(
-                staff_id=staff_id,
-                start_date=date(2024, 1, 1),
-                end_date=date(2024, 12, 31)
-            )
+        result = detect_over_allocations(
+            staff_id=staff_id,
+            start_date=YEAR_START,
+            end_date=YEAR_END
+        )
             
-            assert 'has_conflicts' in result
-            assert result['has_conflicts'] == False
-            assert result['conflict_count'] == 0
+        assert 'has_conflicts' in result
+        assert result['has_conflicts'] == False
+        assert result['conflict_count'] == 0
     
     def test_detect_over_allocations_with_timeline(self, app, test_data):
         """Test that over-allocation detection returns timeline"""
-        with app.app_context():
-            staff_id = test_data['staff_ids'][0]  # Project Manager
+        staff_id = test_data['pm_id']
             
-            result = detect_over_allocations(
-                staff_id=staff_id,
-                start_date=date(2024, 1, 1),
-                end_date=date(2024, 12, 31)
-            )
+        result = detect_over_allocations(
+            staff_id=staff_id,
+            start_date=YEAR_START,
+            end_date=YEAR_END
+        )
             
-            assert 'timeline' in result
-            assert isinstance(result['timeline'], dict)
+        assert 'timeline' in result
+        assert isinstance(result['timeline'], dict)
     
     def test_get_staff_allocation_timeline(self, app, test_data):
         """Test getting detailed allocation timeline"""
-        with app.app_context():
-            staff_id = test_data['staff_ids'][0]
+        staff_id = test_data['pm_id']
             
-            result = get_staff_allocation_timeline(
-                staff_id=staff_id,
-                start_date=date(2024, 1, 1),
-                end_date=date(2024, 12, 31)
-            )
+        result = get_staff_allocation_timeline(
+            staff_id=staff_id,
+            start_date=YEAR_START,
+            end_date=YEAR_END
+        )
             
-            assert 'staff_id' in result
-            assert 'monthly_allocations' in result
-            assert len(result['monthly_allocations']) > 0
+        assert 'staff_id' in result
+        assert 'monthly_allocations' in result
+        assert len(result['monthly_allocations']) > 0
     
     def test_validate_assignment_allocation_valid(self, app, test_data):
         """Test validating a valid assignment"""
-        with app.app_context():
-            staff_id = test_data['staff_ids'][5]  # Available Estimator
+        staff_id = test_data['available_estimator_id']
             
-            result = validate_assignment_allocation(
-                staff_id=staff_id,
-                new_start_date=date(2025, 1, 1),
-                new_end_date=date(2025, 6, 30),
-                new_allocation_percentage=100.0
-            )
+        result = validate_assignment_allocation(
+            staff_id=staff_id,
+            new_start_date=NEXT_YEAR_START,
+            new_end_date=NEXT_MID_YEAR,
+            new_allocation_percentage=100.0
+        )
             
-            assert result['is_valid'] == True
-            assert result['conflict_count'] == 0
+        assert result['is_valid'] == True
+        assert result['conflict_count'] == 0
     
     def test_organization_over_allocations(self, app, test_data):
         """Test organization-wide over-allocation summary"""
-        with app.app_context():
-            result = get_organization_over_allocations(
-                start_date=date(2024, 1, 1),
-                end_date=date(2024, 12, 31)
-            )
+        result = get_organization_over_allocations(
+            start_date=YEAR_START,
+            end_date=YEAR_END
+        )
             
-            assert 'summary' in result
-            assert 'conflicts' in result
-            assert 'clear_staff' in result
-            assert result['summary']['total_staff'] >= 1
+        assert 'summary' in result
+        assert 'conflicts' in result
+        assert 'clear_staff' in result
+        assert result['summary']['total_staff'] >= 1
 
 
 class TestPlanningExercise:
     """Test planning exercise functionality"""
     
-    @pytest.fixture
+    @pytest.fixture(scope='class')
     def planning_data(self, app, test_data):
-        """Create planning exercise test data"""
-        with app.app_context():
-            # Create planning exercise
-            exercise = PlanningExercise(
-                name="Test Planning Exercise",
-                description="Test description",
-                status="active"
-            )
-            db.session.add(exercise)
-            db.session.flush()  # Get the ID
-            exercise_id = exercise.id
-            
-            # Create planning project
-            planning_project = PlanningProject(
-                exercise_id=exercise_id,
-                name="Test Planning Project",
-                start_date=date(2025, 1, 1),
-                duration_months=12,
-                budget=1000000.0
+        """Create planning exercise test data once for the class"""
+        exercise = PlanningExercise(
+            name="Test Planning Exercise",
+            description="Test description",
+            status="active"
+        )
+        planning_project = PlanningProject(
+            exercise_id=None,
+            name="Test Planning Project",
+            start_date=NEXT_YEAR_START,
+            duration_months=12,
+            budget=1000000.0
+        )
+        # Planning roles use role_ids from test_data
+        planning_project.planning_roles = [
+            PlanningRole(
+                planning_project_id=None,
+                role_id=role_id,
+                count=2,
+                start_month_offset=0,
+                end_month_offset=0,
+                allocation_percentage=100.0,
+                hours_per_week=40.0,
+                overlap_mode='efficient'
             )
-            db.session.add(planning_project)
-            db.session.flush()  # Get the ID
-            planning_project_id = planning_project.id
-            
-            # Create planning roles using role_ids from test_data
-            planning_role_ids = []
-            for role_id in test_data['role_ids'][:2]:
-                planning_role = PlanningRole(
-                    planning_project_id=planning_project_id,
-                    role_id=role_id,
-                    count=2,
-                    start_month_offset=0,
-                    end_month_offset=0,
-                    allocation_percentage=100.0,
-                    hours_per_week=40.0,
-                    overlap_mode='efficient'
-                )
-                db.session.add(planning_role)
-                db.session.flush()
-                planning_role_ids.append(planning_role.id)
-            
-            db.session.commit()
-            
-            return {
-                'exercise_id': exercise_id,
-                'project_id': planning_project_id,
-                'role_ids': planning_role_ids
-            }
-    
-    def test_generate_coverage_analysis(self, app, test_data, planning_data):
+            for role_id in test_data['role_ids'][:2]
+        ]
+        exercise.planning_projects.append(planning_project)
+
+        # One flush inserts the whole graph and fills in the ids
+        db.session.add(exercise)
+        db.session.commit()
+
+        return {
+            'exercise_id': exercise.id,
+            'project_id': planning_project.id,
+            'role_ids': [planning_role.id for planning_role in planning_project.planning_roles]
+        }
+
+    def test_generate_coverage_analysis(self, app, planning_data):
         """Test generating coverage analysis for planning exercise"""
-        with app.app_context():
-            result = generate_coverage_analysis(planning_data['exercise_id'])
+        result = generate_coverage_analysis(planning_data['exercise_id'])
             
-            assert 'exercise_id' in result
-            assert 'period' in result
-            assert 'role_coverage' in result
-            assert len(result['role_coverage']) > 0
+        assert 'exercise_id' in result
+        assert 'period' in result
+        assert 'role_coverage' in result
+        assert len(result['role_coverage']) > 0
     
-    def test_calculate_minimum_staff_efficient(self, app, test_data, planning_data):
+    @pytest.fixture(scope='class')
+    def planning_results(self, planning_data):
+        """Staff requirements for both overlap modes and costs, computed once for the class"""
+        exercise_id = planning_data['exercise_id']
+        return {
+            'efficient': calculate_minimum_staff_per_role(exercise_id, overlap_mode='efficient'),
+            'conservative': calculate_minimum_staff_per_role(exercise_id, overlap_mode='conservative'),
+            'costs': calculate_planning_costs(exercise_id)
+        }
+
+    def test_calculate_minimum_staff_efficient(self, planning_results):
         """Test minimum staff calculation in efficient mode"""
-        with app.app_context():
-            result = calculate_minimum_staff_per_role(
-                planning_data['exercise_id'],
-                overlap_mode='efficient'
-            )
-            
-            assert 'staff_requirements' in result
-            assert 'summary' in result
-            assert result['overlap_mode'] == 'efficient'
-    
-    def test_calculate_minimum_staff_conservative(self, app, test_data, planning_data):
+        result = planning_results['efficient']
+
+        assert 'staff_requirements' in result
+        assert 'summary' in result
+        assert result['overlap_mode'] == 'efficient'
+
+    def test_calculate_minimum_staff_conservative(self, planning_results):
         """Test minimum staff calculation in conservative mode"""
-        with app.app_context():
-            result = calculate_minimum_staff_per_role(
-                planning_data['exercise_id'],
-                overlap_mode='conservative'
-            )
-            
-            assert result['overlap_mode'] == 'conservative'
-    
-    def test_calculate_planning_costs(self, app, test_data, planning_data):
+        result = planning_results['conservative']
+
+        assert result['overlap_mode'] == 'conservative'
+
+    def test_calculate_planning_costs(self, planning_results):
         """Test planning exercise cost calculation"""
-        with app.app_context():
-            result = calculate_planning_costs(planning_data['exercise_id'])
-            
-            assert 'summary' in result
-            assert 'monthly_costs' in result
-            assert 'role_costs' in result
-            assert 'project_costs' in result
-            
-            assert result['summary']['total_hours'] >= 0
-            assert result['summary']['total_billable'] >= 0
-    
+        result = planning_results['costs']
+
+        assert 'summary' in result
+        assert 'monthly_costs' in result
+        assert 'role_costs' in result
+        assert 'project_costs' in result
+
+        assert result['summary']['total_hours'] >= 0
+        assert result['summary']['total_billable'] >= 0
+
     def test_planning_exercise_not_found(self, app):
         """Test planning analysis with non-existent exercise"""
-        with app.app_context():
-            with pytest.raises(ValueError):
-                generate_coverage_analysis(99999)
+        with pytest.raises(ValueError):
+            generate_coverage_analysis(99999)
 
 
 if __name__ == '__main__':
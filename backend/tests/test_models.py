@@ -4,23 +4,28 @@ Unit tests for HB-Staffing database models
 
 import pytest
 from datetime import date, datetime
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models import Staff, Project, Assignment, User, Role, ProjectRoleRate, db
 from app import create_app
 
+# Fixed date for model tests so runs don't depend on the calendar
+TEST_DATE = date(2024, 6, 1)
 
-@pytest.fixture
+# Every test runs in a SAVEPOINT rolled back afterwards, so each starts from
+# the same empty tables (see conftest)
+pytestmark = pytest.mark.usefixtures('db_transaction')
+
+
+@pytest.fixture(scope='module')
 def app():
-    """Create and configure a test app instance."""
+    """Create the test app and an empty schema once for this module's tests."""
     app = create_app('testing')
     with app.app_context():
+        # Model tests start from empty tables rather than the startup seed data
+        db.drop_all()
         db.create_all()
         yield app
         db.session.remove()
-        db.drop_all()
 
 
 @pytest.fixture
@@ -210,7 +215,7 @@ class TestStaffModel:
             # Create project
             project = Project(
                 name="Test Project",
-                start_date=date.today(),
+                start_date=TEST_DATE,
                 status="active"
             )
             db.session.add(project)
@@ -220,8 +225,8 @@ class TestStaffModel:
             assignment = Assignment(
                 staff_id=staff.id,
                 project_id=project.id,
-                start_date=date.today(),
-                end_date=date.today(),
+                start_date=TEST_DATE,
+                end_date=TEST_DATE,
                 hours_per_week=40.0
             )
             db.session.add(assignment)
@@ -286,8 +291,8 @@ class TestProjectModel:
             assignment = Assignment(
                 staff_id=staff.id,
                 project_id=project.id,
-                start_date=date.today(),
-                end_date=date.today(),
+                start_date=TEST_DATE,
+                end_date=TEST_DATE,
                 hours_per_week=40.0
             )
             db.session.add(assignment)
@@ -434,6 +439,38 @@ class TestUserModel:
             assert found_by_email == user2
             assert User.get_by_username("nonexistent") is None
 
+    def test_user_to_dict_excludes_password_hash(self, app):
+        """Test generated column serializer skips excluded columns"""
+        with app.app_context():
+            user = User(username="dict_user", email="dict@test.com", password="pass")
+            db.session.add(user)
+            db.session.commit()
+
+            data = user.to_dict()
+            assert 'password_hash' not in data
+            assert data['username'] == "dict_user"
+            assert data['last_login'] is None
+            assert data['created_at'] == user.created_at.replace(tzinfo=None).isoformat()
+
+            sensitive = user.to_dict(include_sensitive=True)
+            assert sensitive['password_hash'] == user.password_hash
+
+    def test_user_column_projection_matches_to_dict(self, app):
+        """Test serializing a projected row gives the same dict as to_dict"""
+        from sqlalchemy import select
+        from models import column_projection, get_column_serializer
+
+        with app.app_context():
+            user = User(username="projected_user", email="projected@test.com", password="pass")
+            db.session.add(user)
+            db.session.commit()
+
+            row = db.session.execute(
+                select(*column_projection(User, exclude=User.SENSITIVE_COLUMNS)).where(User.id == user.id)
+            ).one()
+            serialize = get_column_serializer(User, User.SENSITIVE_COLUMNS)
+            assert serialize(row) == user.to_dict()
+
 
 class TestProjectHierarchy:
     """Test cases for Project hierarchy (folders and sub-projects)"""
@@ -620,6 +657,42 @@ class TestProjectRoleRate:
             assert child_result['rate'] == 110.0
             assert child_result['is_inherited'] == True
 
+    def test_get_all_role_rates_resolves_nearest_ancestor(self, app):
+        """Test that get_all_role_rates picks the closest explicit rate in the chain"""
+        with app.app_context():
+            inherited_role = Role(name="Chain Inherited Role", hourly_cost=50.0)
+            override_role = Role(name="Chain Override Role", hourly_cost=55.0)
+            db.session.add_all([inherited_role, override_role])
+
+            root = Project(name="Chain Root", status="active", is_folder=True)
+            db.session.add(root)
+            db.session.commit()
+
+            middle = Project(name="Chain Middle", status="active", is_folder=True, parent_project_id=root.id)
+            db.session.add(middle)
+            db.session.commit()
+
+            leaf = Project(name="Chain Leaf", status="planning", parent_project_id=middle.id)
+            db.session.add(leaf)
+            db.session.commit()
+
+            db.session.add_all([
+                ProjectRoleRate(project_id=root.id, role_id=inherited_role.id, billable_rate=100.0),
+                ProjectRoleRate(project_id=root.id, role_id=override_role.id, billable_rate=120.0),
+                ProjectRoleRate(project_id=leaf.id, role_id=override_role.id, billable_rate=140.0),
+            ])
+            db.session.commit()
+
+            rates = {rate['role_id']: rate for rate in leaf.get_all_role_rates()}
+
+            assert rates[inherited_role.id]['billable_rate'] == 100.0
+            assert rates[inherited_role.id]['is_inherited'] == True
+            assert rates[inherited_role.id]['source_project_id'] == root.id
+
+            assert rates[override_role.id]['billable_rate'] == 140.0
+            assert rates[override_role.id]['is_inherited'] == False
+            assert rates[override_role.id]['source_project_id'] == leaf.id
+
 
 class TestAssignmentWithProjectRates:
     """Test cases for Assignment cost calculations with project role rates"""
@@ -5,9 +5,6 @@ Unit tests for HB-Staffing API routes
 import pytest
 import json
 from datetime import date
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import create_app
 from models import db, Staff, Project, Assignment, User, Role, PlanningExercise, PlanningProject, PlanningRole
@@ -15,13 +12,15 @@ from models import db, Staff, Project, Assignment, User, Role, PlanningExercise,
 
 @pytest.fixture
 def app():
-    """Create and configure a test app instance."""
+    """Create and configure a test app instance.
+
+    create_app builds and seeds a fresh in-memory database that is discarded
+    along with the app, so the schema needs no setup or teardown here.
+    """
     app = create_app('testing')
     with app.app_context():
-        db.create_all()
         yield app
         db.session.remove()
-        db.drop_all()
 
 
 @pytest.fixture
@@ -67,16 +66,18 @@ def test_roles(app):
             {"name": "Test Developer", "hourly_cost": 55.0, "description": "Software development"}
         ]
         
+        # One IN query for the roles that already exist, then add the rest
+        existing_by_name = {
+            role.name: role
+            for role in Role.query.filter(Role.name.in_([data['name'] for data in role_data])).all()
+        }
         for data in role_data:
-            existing = Role.query.filter_by(name=data['name']).first()
-            if existing:
-                roles.append(existing)
-            else:
+            role = existing_by_name.get(data['name'])
+            if role is None:
                 role = Role(name=data['name'], hourly_cost=data['hourly_cost'], description=data['description'])
                 db.session.add(role)
-                db.session.flush()
-                roles.append(role)
-        
+            roles.append(role)
+
         db.session.commit()
         return {'roles': roles, 'role_ids': [r.id for r in roles]}
 
@@ -86,7 +87,6 @@ def test_data(app, test_roles):
     """Create test data for API testing."""
     with app.app_context():
         # Get roles from the fixture
-        roles = test_roles['roles']
         role_ids = test_roles['role_ids']
 
         # Create test staff with role_id (using internal_hourly_cost)
@@ -129,14 +129,11 @@ def test_data(app, test_roles):
         assignment_ids = [assignment1.id]
         db.session.commit()
 
+        # Plain ids only: the ORM instances are detached once the context pops
         return {
-            'staff': [staff1, staff2],
             'staff_ids': staff_ids,
-            'projects': [project1, project2],
             'project_ids': project_ids,
-            'assignments': [assignment1],
             'assignment_ids': assignment_ids,
-            'roles': roles,
             'role_ids': role_ids
         }
 
@@ -154,6 +151,28 @@ class TestHealthEndpoint:
         assert 'message' in data
 
 
+class TestJSONProvider:
+    """Test the application JSON provider"""
+
+    def test_dumps_matches_default_format(self, app):
+        """Test keys are sorted and dates keep Flask's HTTP date format"""
+        payload = {'b': 1, 'a': date(2024, 1, 1), 2: 'int key'}
+        assert app.json.dumps(payload) == '{"2":"int key","a":"Mon, 01 Jan 2024 00:00:00 GMT","b":1}'
+
+    def test_loads(self, app):
+        """Test JSON strings and bytes are parsed"""
+        assert app.json.loads('{"a": [1, 2]}') == {'a': [1, 2]}
+        assert app.json.loads(b'{"a": null}') == {'a': None}
+
+    def test_response_matches_dumps(self, app):
+        """Test JSON responses carry the same body as dumps plus a trailing newline"""
+        payload = {'b': [1.5, None], 'a': date(2024, 1, 1)}
+        with app.app_context():
+            response = app.json.response(payload)
+        assert response.mimetype == 'application/json'
+        assert response.get_data(as_text=True) == app.json.dumps(payload) + '\n'
+
+
 class TestRoleEndpoints:
     """Test role API endpoints"""
 
@@ -330,7 +349,7 @@ class TestStaffEndpoints:
 
     def test_get_staff_by_id(self, client, auth_headers, test_data):
         """Test getting a specific staff member"""
-        staff_id = test_data['staff'][0].id
+        staff_id = test_data['staff_ids'][0]
 
         response = client.get(f'/api/staff/{staff_id}', headers=auth_headers)
         assert response.status_code == 200
@@ -351,8 +370,8 @@ class TestStaffEndpoints:
 
     def test_update_staff(self, client, auth_headers, test_data):
         """Test updating a staff member"""
-        staff_id = test_data['staff'][0].id
-        role_id = test_data['staff'][0].role_id
+        staff_id = test_data['staff_ids'][0]
+        role_id = test_data['role_ids'][0]
         update_data = {
             'name': 'Updated Name',
             'role_id': role_id,
@@ -369,7 +388,7 @@ class TestStaffEndpoints:
     def test_delete_staff(self, client, auth_headers, test_data):
         """Test deleting a staff member without assignments"""
         # Use staff2 which doesn't have assignments
-        staff_id = test_data['staff'][1].id
+        staff_id = test_data['staff_ids'][1]
 
         response = client.delete(f'/api/staff/{staff_id}', headers=auth_headers)
         assert response.status_code == 200
@@ -391,6 +410,32 @@ class TestProjectEndpoints:
         assert isinstance(data, list)
         assert len(data) >= 2
 
+    def test_get_projects_include_children(self, client, auth_headers):
+        """Test top-level projects are returned with their sub-project tree"""
+        folder = Project(name="Tree Folder", status="active", is_folder=True)
+        db.session.add(folder)
+        db.session.flush()
+        child = Project(name="Tree Child", status="active", parent_project_id=folder.id, is_folder=True)
+        db.session.add(child)
+        db.session.flush()
+        db.session.add(Project(name="Tree Grandchild", status="active", parent_project_id=child.id))
+        db.session.commit()
+
+        response = client.get('/api/projects?top_level_only=true&include_children=true', headers=auth_headers)
+        assert response.status_code == 200
+
+        data = {p['name']: p for p in response.get_json()}
+        assert 'Tree Child' not in data
+        tree_folder = data['Tree Folder']
+        assert tree_folder['sub_projects_count'] == 1
+        assert len(tree_folder['sub_projects']) == 1
+
+        sub_project = tree_folder['sub_projects'][0]
+        assert sub_project['name'] == 'Tree Child'
+        assert sub_project['parent_project_name'] == 'Tree Folder'
+        assert sub_project['sub_projects_count'] == 1
+        assert 'sub_projects' not in sub_project
+
     def test_create_project(self, client, auth_headers):
         """Test creating a new project"""
         project_data = {
@@ -418,7 +463,7 @@ class TestProjectEndpoints:
 
     def test_get_project_by_id(self, client, auth_headers, test_data):
         """Test getting a specific project"""
-        project_id = test_data['projects'][0].id
+        project_id = test_data['project_ids'][0]
 
         response = client.get(f'/api/projects/{project_id}', headers=auth_headers)
         assert response.status_code == 200
@@ -429,7 +474,7 @@ class TestProjectEndpoints:
 
     def test_update_project(self, client, auth_headers, test_data):
         """Test updating a project"""
-        project_id = test_data['projects'][0].id
+        project_id = test_data['project_ids'][0]
         update_data = {
             'name': 'Updated Project Name',
             'status': 'completed'
@@ -454,11 +499,21 @@ class TestAssignmentEndpoints:
         data = response.get_json()
         assert isinstance(data, list)
 
+    def test_get_assignments_list_streamed(self, client, auth_headers, test_data):
+        """Test streamed assignment list matches the buffered response"""
+        buffered = client.get('/api/assignments', headers=auth_headers).get_json()
+
+        response = client.get('/api/assignments?stream=true', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'application/json'
+        assert json.loads(response.get_data(as_text=True)) == buffered
+
     def test_create_assignment(self, client, auth_headers, test_data):
         """Test creating a new assignment"""
         assignment_data = {
-            'staff_id': test_data['staff'][0].id,
-            'project_id': test_data['projects'][0].id,
+            'staff_id': test_data['staff_ids'][0],
+            'project_id': test_data['project_ids'][0],
             'start_date': '2024-04-01',
             'end_date': '2024-06-30',
             'hours_per_week': 35.0,
@@ -469,14 +524,132 @@ class TestAssignmentEndpoints:
         assert response.status_code == 201
 
         data = response.get_json()
-        assert data['staff_id'] == test_data['staff'][0].id
+        assert data['staff_id'] == test_data['staff_ids'][0]
         assert data['hours_per_week'] == 35.0
 
+    def test_create_assignment_with_monthly_allocations(self, client, auth_headers, test_data):
+        """Test creating a percentage_monthly assignment stores every month"""
+        assignment_data = {
+            'staff_id': test_data['staff_ids'][1],
+            'project_id': test_data['project_ids'][0],
+            'start_date': '2024-04-01',
+            'end_date': '2024-06-30',
+            'hours_per_week': 40.0,
+            'allocation_type': 'percentage_monthly',
+            'monthly_allocations': [
+                {'month': '2024-04-01', 'allocation_percentage': 50.0},
+                {'month': '2024-05-01', 'allocation_percentage': 75.0},
+                {'month': '2024-06-01'}
+            ]
+        }
+
+        response = client.post('/api/assignments', json=assignment_data, headers=auth_headers)
+        assert response.status_code == 201
+
+        data = response.get_json()
+        allocations = {ma['month']: ma['allocation_percentage'] for ma in data['monthly_allocations']}
+        assert allocations == {'2024-04-01': 50.0, '2024-05-01': 75.0, '2024-06-01': 100.0}
+
+        response = client.get(f"/api/assignments/{data['id']}/monthly-allocations", headers=auth_headers)
+        assert response.status_code == 200
+
+        months = {m['month']: m['allocation_percentage'] for m in response.get_json()['months']}
+        assert months == {'2024-04-01': 50.0, '2024-05-01': 75.0, '2024-06-01': 100.0}
+
+    def test_update_assignment_monthly_allocations(self, client, auth_headers, test_data):
+        """Test updating monthly allocations updates existing months and adds new ones"""
+        assignment_data = {
+            'staff_id': test_data['staff_ids'][1],
+            'project_id': test_data['project_ids'][0],
+            'start_date': '2024-04-01',
+            'end_date': '2024-06-30',
+            'hours_per_week': 40.0,
+            'allocation_type': 'percentage_monthly',
+            'monthly_allocations': [
+                {'month': '2024-04-01', 'allocation_percentage': 50.0}
+            ]
+        }
+        response = client.post('/api/assignments', json=assignment_data, headers=auth_headers)
+        assert response.status_code == 201
+        assignment_id = response.get_json()['id']
+
+        update_data = {
+            'allocations': [
+                {'month': '2024-04-15', 'allocation_percentage': 25.0},
+                {'month': '2024-05-01', 'allocation_percentage': 60.0}
+            ]
+        }
+        response = client.put(f'/api/assignments/{assignment_id}/monthly-allocations',
+                              json=update_data, headers=auth_headers)
+        assert response.status_code == 200
+
+        allocations = {ma['month']: ma['allocation_percentage']
+                       for ma in response.get_json()['monthly_allocations']}
+        assert allocations == {'2024-04-01': 25.0, '2024-05-01': 60.0}
+
+    def test_batch_update_assignment_monthly_allocations(self, client, auth_headers, test_data):
+        """Test updating monthly allocations for several assignments at once"""
+        assignment_ids = []
+        for staff_id in test_data['staff_ids'][:2]:
+            response = client.post('/api/assignments', json={
+                'staff_id': staff_id,
+                'project_id': test_data['project_ids'][0],
+                'start_date': '2024-04-01',
+                'end_date': '2024-05-31',
+                'hours_per_week': 20.0,
+                'allocation_type': 'percentage_monthly',
+                'monthly_allocations': [{'month': '2024-04-01', 'allocation_percentage': 50.0}]
+            }, headers=auth_headers)
+            assert response.status_code == 201
+            assignment_ids.append(response.get_json()['id'])
+
+        response = client.put('/api/assignments/monthly-allocations/batch', json={
+            'assignments': [
+                {'assignment_id': assignment_ids[0], 'allocations': [
+                    {'month': '2024-04-01', 'allocation_percentage': 10.0},
+                    {'month': '2024-05-01', 'allocation_percentage': 20.0}
+                ]},
+                {'assignment_id': assignment_ids[1], 'allocations': [
+                    {'month': '2024-05-01', 'allocation_percentage': 30.0}
+                ]}
+            ]
+        }, headers=auth_headers)
+        assert response.status_code == 200
+
+        results = {a['id']: a for a in response.get_json()['assignments']}
+        first = {ma['month']: ma['allocation_percentage'] for ma in results[assignment_ids[0]]['monthly_allocations']}
+        second = {ma['month']: ma['allocation_percentage'] for ma in results[assignment_ids[1]]['monthly_allocations']}
+        assert first == {'2024-04-01': 10.0, '2024-05-01': 20.0}
+        assert second == {'2024-04-01': 50.0, '2024-05-01': 30.0}
+
+    def test_batch_update_monthly_allocations_unknown_assignment(self, client, auth_headers):
+        """Test batch update rejects unknown assignments"""
+        response = client.put('/api/assignments/monthly-allocations/batch', json={
+            'assignments': [{'assignment_id': 99999, 'allocations': [{'month': '2024-04-01'}]}]
+        }, headers=auth_headers)
+        assert response.status_code == 404
+
+    def test_batch_update_monthly_allocations_invalid_entries(self, client, auth_headers):
+        """Test batch update rejects malformed entries and allocations"""
+        invalid_entries = (
+            'not-an-object',
+            {'assignment_id': '5', 'allocations': []},
+            {'assignment_id': 1, 'allocations': 5},
+            {'assignment_id': 1, 'allocations': [5]},
+            {'assignment_id': 1, 'allocations': [{'month': 123}]},
+            {'assignment_id': 1, 'allocations': [{'month': ['x']}]},
+        )
+        for entry in invalid_entries:
+            response = client.put('/api/assignments/monthly-allocations/batch', json={
+                'assignments': [entry]
+            }, headers=auth_headers)
+            assert response.status_code == 400
+
     def test_create_assignment_invalid_dates(self, client, auth_headers, test_data):
         """Test creating assignment with invalid date range"""
         invalid_data = {
-            'staff_id': test_data['staff'][0].id,
-            'project_id': test_data['projects'][0].id,
+            'staff_id': test_data['staff_ids'][0],
+            'project_id': test_data['project_ids'][0],
             'start_date': '2024-06-01',
             'end_date': '2024-05-01',  # End before start
             'hours_per_week': 40.0
@@ -485,6 +658,19 @@ class TestAssignmentEndpoints:
         response = client.post('/api/assignments', json=invalid_data, headers=auth_headers)
         assert response.status_code == 400
 
+    def test_create_assignment_non_string_date(self, client, auth_headers, test_data):
+        """Test creating assignment with a non-string date is rejected"""
+        invalid_data = {
+            'staff_id': test_data['staff_ids'][0],
+            'project_id': test_data['project_ids'][0],
+            'start_date': ['2024-06-01'],
+            'end_date': '2024-12-31',
+            'hours_per_week': 40.0
+        }
+
+        response = client.post('/api/assignments', json=invalid_data, headers=auth_headers)
+        assert response.status_code == 400
+
 
 class TestAuthEndpoints:
     """Test authentication endpoints"""
@@ -550,7 +736,7 @@ class TestForecastingEndpoints:
 
     def test_get_project_forecast(self, client, auth_headers, test_data):
         """Test getting project forecast"""
-        project_id = test_data['projects'][0].id
+        project_id = test_data['project_ids'][0]
 
         response = client.get(f'/api/projects/{project_id}/forecast', headers=auth_headers)
         assert response.status_code == 200
@@ -564,10 +750,45 @@ class TestForecastingEndpoints:
                              headers=auth_headers)
         assert response.status_code == 200
 
+    def test_get_organization_forecast_date_formats(self, client, auth_headers):
+        """Test full ISO datetimes are accepted and invalid dates are rejected"""
+        response = client.get('/api/forecasts/organization?start_date=2024-01-01T00:00:00&end_date=2024-12-31',
+                             headers=auth_headers)
+        assert response.status_code == 200
+        assert response.get_json()['forecast_period']['start_date'] == '2024-01-01'
+
+        response = client.get('/api/forecasts/organization?start_date=not-a-date&end_date=2024-12-31',
+                             headers=auth_headers)
+        assert response.status_code == 400
+        assert response.get_json()['error']['message'] == 'Invalid date format for start_date'
+
+    def test_get_organization_forecast_cached(self, client, auth_headers, test_data):
+        """Test forecast responses are revalidated by ETag until the data changes"""
+        url = '/api/forecasts/organization?start_date=2024-01-01&end_date=2024-12-31'
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+
+        response = client.post('/api/assignments', json={
+            'staff_id': test_data['staff_ids'][1],
+            'project_id': test_data['project_ids'][1],
+            'start_date': '2024-03-01',
+            'end_date': '2024-04-30',
+            'hours_per_week': 10.0
+        }, headers=auth_headers)
+        assert response.status_code == 201
+
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
     def test_simulate_forecast(self, client, auth_headers, test_data):
         """Test forecast simulation"""
         simulation_data = {
-            'project_id': test_data['projects'][0].id,
+            'project_id': test_data['project_ids'][0],
             'changes': {
                 'add_staff': [{'role': 'Estimator', 'count': 1}]
             }
@@ -624,6 +845,67 @@ class TestPlanningExerciseEndpoints:
         data = response.get_json()
         assert isinstance(data, list)
 
+    def test_get_planning_exercises_paginated(self, client, auth_headers, planning_test_data):
+        """Test keyset pagination walks every exercise newest first without repeats"""
+        for index in range(5):
+            client.post('/api/planning-exercises', json={'name': f'Page Exercise {index}'}, headers=auth_headers)
+
+        names = []
+        cursor = None
+        while True:
+            url = '/api/planning-exercises?limit=2&include_projects=false'
+            if cursor:
+                url += f'&cursor={cursor}'
+            response = client.get(url, headers=auth_headers)
+            assert response.status_code == 200
+            page = response.get_json()
+            assert len(page['exercises']) <= 2
+            names.extend(e['name'] for e in page['exercises'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        all_names = [e['name'] for e in client.get('/api/planning-exercises', headers=auth_headers).get_json()]
+        assert names == all_names
+        assert names[:5] == [f'Page Exercise {index}' for index in reversed(range(5))]
+
+        response = client.get('/api/planning-exercises?limit=2&cursor=not-a-cursor', headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_get_planning_exercises_invalid_pagination(self, client, auth_headers, planning_test_data):
+        """Test a cursor without a limit and a non-integer limit are rejected"""
+        response = client.get('/api/planning-exercises?cursor=', headers=auth_headers)
+        assert response.status_code == 400
+
+        response = client.get('/api/planning-exercises?limit=abc', headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_get_planning_exercises_include_projects(self, client, auth_headers, planning_test_data):
+        """Test listing exercises with their projects and roles"""
+        exercise_data = {
+            'name': 'Nested List Exercise',
+            'projects': [{
+                'name': 'Nested List Project',
+                'start_date': '2025-01-01',
+                'duration_months': 6,
+                'roles': [{'role_id': planning_test_data['manager_role_id'], 'count': 2}]
+            }]
+        }
+        client.post('/api/planning-exercises', json=exercise_data, headers=auth_headers)
+
+        response = client.get('/api/planning-exercises', headers=auth_headers)
+        assert response.status_code == 200
+        exercise = next(e for e in response.get_json() if e['name'] == 'Nested List Exercise')
+        assert exercise['project_count'] == 1
+        role = exercise['projects'][0]['roles'][0]
+        assert role['count'] == 2
+        assert role['role_name'] is not None
+
+        response = client.get('/api/planning-exercises?include_projects=false', headers=auth_headers)
+        exercise = next(e for e in response.get_json() if e['name'] == 'Nested List Exercise')
+        assert exercise['project_count'] == 1
+        assert 'projects' not in exercise
+
     def test_get_planning_exercise_by_id(self, client, auth_headers, planning_test_data):
         """Test getting a specific planning exercise"""
         # First create an exercise
@@ -665,6 +947,50 @@ class TestPlanningExerciseEndpoints:
         assert data['name'] == 'Updated Exercise Name'
         assert data['status'] == 'active'
 
+    def test_get_planning_exercise_conditional(self, client, auth_headers, planning_test_data):
+        """Test exercise reads are revalidated by ETag until the exercise changes"""
+        create_response = client.post('/api/planning-exercises', json={'name': 'Conditional Exercise'},
+                                      headers=auth_headers)
+        url = f"/api/planning-exercises/{create_response.get_json()['id']}"
+
+        response = client.get(url, headers=auth_headers)
+        etag = response.headers['ETag']
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+
+        # Other exercises and logins don't touch this exercise's version
+        client.post('/api/planning-exercises', json={'name': 'Unrelated Exercise'}, headers=auth_headers)
+        client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpass'})
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+
+        client.put(url, json={'name': 'Renamed Conditional Exercise'}, headers=auth_headers)
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json()['name'] == 'Renamed Conditional Exercise'
+
+    def test_get_planning_exercise_creator_rename(self, client, auth_headers, planning_test_data):
+        """Test renaming an exercise's creator invalidates the cached creator_name"""
+        with client.application.app_context():
+            user_id = User.query.filter_by(username='testuser').one().id
+        create_response = client.post('/api/planning-exercises',
+                                      json={'name': 'Creator Exercise', 'created_by': user_id},
+                                      headers=auth_headers)
+        url = f"/api/planning-exercises/{create_response.get_json()['id']}"
+
+        response = client.get(url, headers=auth_headers)
+        etag = response.headers['ETag']
+        assert response.get_json()['creator_name'] == 'testuser'
+
+        with client.application.app_context():
+            db.session.get(User, user_id).username = 'renameduser'
+            db.session.commit()
+
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert response.get_json()['creator_name'] == 'renameduser'
+
     def test_delete_planning_exercise(self, client, auth_headers, planning_test_data):
         """Test deleting a planning exercise"""
         # First create an exercise
@@ -684,6 +1010,33 @@ class TestPlanningExerciseEndpoints:
         get_response = client.get(f'/api/planning-exercises/{exercise_id}', headers=auth_headers)
         assert get_response.status_code == 404
 
+    def test_delete_planning_exercise_removes_children(self, client, auth_headers, planning_test_data):
+        """Test deleting an exercise removes its projects and roles"""
+        exercise_data = {
+            'name': 'Delete Children Exercise',
+            'projects': [{
+                'name': 'Delete Children Project',
+                'start_date': '2025-01-01',
+                'duration_months': 6,
+                'roles': [{'role_id': planning_test_data['manager_role_id'], 'count': 1}]
+            }]
+        }
+        exercise = client.post('/api/planning-exercises', json=exercise_data, headers=auth_headers).get_json()
+        project_id = exercise['projects'][0]['id']
+        role_id = exercise['projects'][0]['roles'][0]['id']
+
+        response = client.delete(f"/api/planning-exercises/{exercise['id']}", headers=auth_headers)
+        assert response.status_code == 200
+
+        with client.application.app_context():
+            assert db.session.get(PlanningProject, project_id) is None
+            assert db.session.get(PlanningRole, role_id) is None
+
+        response = client.delete(f"/api/planning-exercises/{exercise['id']}", headers=auth_headers)
+        assert response.status_code == 404
+        response = client.delete(f'/api/planning-roles/{role_id}', headers=auth_headers)
+        assert response.status_code == 404
+
     def test_add_project_to_exercise(self, client, auth_headers, planning_test_data):
         """Test adding a project to a planning exercise"""
         # Create exercise
@@ -771,12 +1124,319 @@ class TestPlanningExerciseEndpoints:
         data = response.get_json()
         assert 'coverage' in data or 'role_coverage' in data or 'summary' in data
 
+    def test_create_planning_exercise_with_projects(self, client, auth_headers, planning_test_data):
+        """Test nested projects are created with their own roles"""
+        exercise_data = {
+            'name': 'Nested Create Exercise',
+            'projects': [
+                {
+                    'name': f'Nested Project {index}',
+                    'start_date': '2025-01-01',
+                    'duration_months': 6,
+                    'roles': [{'role_id': planning_test_data['estimator_role_id'], 'count': index + 1}] * index
+                }
+                for index in range(3)
+            ]
+        }
+        response = client.post('/api/planning-exercises', json=exercise_data, headers=auth_headers)
+        assert response.status_code == 201
+
+        data = response.get_json()
+        assert data['project_count'] == 3
+        for project in data['projects']:
+            index = int(project['name'].rsplit(' ', 1)[1])
+            assert project['role_count'] == index
+            assert all(role['count'] == index + 1 for role in project.get('roles', []))
+
+    def test_create_planning_exercise_invalid_choices(self, client, auth_headers, planning_test_data):
+        """Test invalid status and overlap_mode values are rejected with the allowed choices"""
+        response = client.post('/api/planning-exercises', json={'name': 'Bad Status', 'status': 'bogus'},
+                               headers=auth_headers)
+        assert response.status_code == 400
+        assert response.get_json()['error']['message'] == \
+            'Invalid status. Must be one of: draft, active, completed, archived'
+
+        exercise_data = {
+            'name': 'Bad Overlap Mode',
+            'projects': [{
+                'name': 'Bad Overlap Project',
+                'start_date': '2025-01-01',
+                'duration_months': 6,
+                'roles': [{'role_id': planning_test_data['manager_role_id'], 'count': 1, 'overlap_mode': 'bogus'}]
+            }]
+        }
+        response = client.post('/api/planning-exercises', json=exercise_data, headers=auth_headers)
+        assert response.status_code == 400
+        assert response.get_json()['error']['message'] == \
+            'Invalid overlap_mode. Must be one of: efficient, conservative'
+
+    @pytest.mark.parametrize('value', [['draft'], {}])
+    def test_planning_choices_reject_unhashable_values(self, client, auth_headers, planning_test_data, value):
+        """Test list and dict status/overlap_mode values are rejected with 400 rather than erroring"""
+        role = {'role_id': planning_test_data['manager_role_id'], 'count': 1}
+        project = {'name': 'Unhashable Project', 'start_date': '2025-01-01', 'duration_months': 6}
+
+        response = client.post('/api/planning-exercises', json={'name': 'Unhashable', 'status': value},
+                               headers=auth_headers)
+        assert response.status_code == 400
+        response = client.post('/api/planning-exercises', json={
+            'name': 'Unhashable', 'projects': [{**project, 'roles': [{**role, 'overlap_mode': value}]}]
+        }, headers=auth_headers)
+        assert response.status_code == 400
+
+        exercise = client.post('/api/planning-exercises', json={
+            'name': 'Unhashable Target', 'projects': [{**project, 'roles': [role]}]
+        }, headers=auth_headers).get_json()
+        project_id = exercise['projects'][0]['id']
+        role_id = exercise['projects'][0]['roles'][0]['id']
+
+        response = client.put(f"/api/planning-exercises/{exercise['id']}", json={'status': value},
+                              headers=auth_headers)
+        assert response.status_code == 400
+        response = client.post(f'/api/planning-projects/{project_id}/roles', json={**role, 'overlap_mode': value},
+                               headers=auth_headers)
+        assert response.status_code == 400
+        response = client.put(f'/api/planning-roles/{role_id}', json={'overlap_mode': value}, headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_create_planning_exercise_malformed_roles(self, client, auth_headers, planning_test_data):
+        """Test malformed projects and roles are rejected before the role lookup"""
+        project = {'name': 'Malformed Project', 'start_date': '2025-01-01', 'duration_months': 6}
+        for projects in (['x'], [{**project, 'roles': ['x']}], [{**project, 'roles': [{'role_id': [1], 'count': 1}]}]):
+            response = client.post('/api/planning-exercises', json={'name': 'Malformed Exercise', 'projects': projects},
+                                   headers=auth_headers)
+            assert response.status_code == 400
+
+        exercise_id = client.post('/api/planning-exercises', json={'name': 'Malformed Role Exercise'},
+                                  headers=auth_headers).get_json()['id']
+        response = client.post(f'/api/planning-exercises/{exercise_id}/projects',
+                               json={**project, 'roles': [{'role_id': [1], 'count': 1}]}, headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_create_planning_exercise_with_unknown_role(self, client, auth_headers, planning_test_data):
+        """Test an unknown role rejects the whole exercise without creating anything"""
+        exercise_data = {
+            'name': 'Unknown Role Exercise',
+            'projects': [{
+                'name': 'Unknown Role Project',
+                'start_date': '2025-01-01',
+                'duration_months': 6,
+                'roles': [
+                    {'role_id': planning_test_data['manager_role_id'], 'count': 1},
+                    {'role_id': 99999, 'count': 1}
+                ]
+            }]
+        }
+        response = client.post('/api/planning-exercises', json=exercise_data, headers=auth_headers)
+        assert response.status_code == 404
+
+        response = client.get('/api/planning-exercises', headers=auth_headers)
+        assert all(e['name'] != 'Unknown Role Exercise' for e in response.get_json())
+
+    def test_planning_costs_streamed(self, client, auth_headers, planning_test_data):
+        """Test streamed planning costs match the buffered response"""
+        exercise_data = {
+            'name': 'Streamed Costs Exercise',
+            'projects': [{
+                'name': 'Streamed Costs Project',
+                'start_date': '2025-01-01',
+                'duration_months': 3,
+                'roles': [{'role_id': planning_test_data['manager_role_id'], 'count': 1}]
+            }]
+        }
+        exercise_id = client.post('/api/planning-exercises', json=exercise_data, headers=auth_headers).get_json()['id']
+
+        url = f'/api/planning-exercises/{exercise_id}/costs'
+        response = client.get(url, headers=auth_headers)
+        streamed = client.get(f'{url}?stream=true', headers=auth_headers)
+        assert streamed.status_code == 200
+        assert streamed.is_streamed
+        assert streamed.get_json() == response.get_json()
+
+    def test_planning_costs_cached_until_roles_change(self, client, auth_headers, planning_test_data):
+        """Test planning costs are revalidated by ETag until a planning role changes"""
+        exercise_data = {
+            'name': 'Cached Costs Exercise',
+            'projects': [{
+                'name': 'Cached Costs Project',
+                'start_date': '2025-01-01',
+                'duration_months': 6,
+                'roles': [{'role_id': planning_test_data['manager_role_id'], 'count': 1}]
+            }]
+        }
+        create_response = client.post('/api/planning-exercises', json=exercise_data, headers=auth_headers)
+        assert create_response.status_code == 201
+        exercise = create_response.get_json()
+        role_id = exercise['projects'][0]['roles'][0]['id']
+
+        url = f"/api/planning-exercises/{exercise['id']}/costs"
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        original_costs = response.get_json()
+
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+
+        # A write to another exercise leaves this exercise's costs cached
+        client.post('/api/planning-exercises', json={'name': 'Other Costs Exercise'}, headers=auth_headers)
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+
+        response = client.put(f'/api/planning-roles/{role_id}', json={'count': 3}, headers=auth_headers)
+        assert response.status_code == 200
+
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert response.get_json() != original_costs
+
+    def test_staff_requirements_cached_until_monthly_allocations_change(self, client, auth_headers, test_data,
+                                                                       planning_test_data):
+        """Test staff requirements are recomputed when a suggested staff member's monthly allocation changes"""
+        response = client.post('/api/assignments', json={
+            'staff_id': test_data['staff_ids'][1],
+            'project_id': test_data['project_ids'][0],
+            'start_date': '2025-01-01',
+            'end_date': '2025-01-31',
+            'hours_per_week': 40.0,
+            'allocation_type': 'percentage_monthly',
+            'monthly_allocations': [{'month': '2025-01-01', 'allocation_percentage': 0.0}]
+        }, headers=auth_headers)
+        assert response.status_code == 201
+        assignment_id = response.get_json()['id']
+
+        exercise_data = {
+            'name': 'Cached Requirements Exercise',
+            'projects': [{
+                'name': 'Cached Requirements Project',
+                'start_date': '2025-01-01',
+                'duration_months': 1,
+                'roles': [{'role_id': planning_test_data['estimator_role_id'], 'count': 1}]
+            }]
+        }
+        exercise_id = client.post('/api/planning-exercises', json=exercise_data, headers=auth_headers).get_json()['id']
+
+        url = f'/api/planning-exercises/{exercise_id}/staff-requirements'
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        suggested = response.get_json()['staff_requirements'][0]['staff_suggestions']
+        assert test_data['staff_ids'][1] in [s['staff_id'] for s in suggested]
+
+        response = client.put(f'/api/assignments/{assignment_id}/monthly-allocations', json={
+            'allocations': [{'month': '2025-01-01', 'allocation_percentage': 50.0}]
+        }, headers=auth_headers)
+        assert response.status_code == 200
+
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        suggested = response.get_json()['staff_requirements'][0]['staff_suggestions']
+        assert test_data['staff_ids'][1] not in [s['staff_id'] for s in suggested]
+
     def test_get_planning_exercise_not_found(self, client, auth_headers):
         """Test getting non-existent planning exercise"""
         response = client.get('/api/planning-exercises/99999', headers=auth_headers)
         assert response.status_code == 404
 
 
+class TestTemplateEndpoints:
+    """Test project template endpoints"""
+
+    def test_create_project_from_template(self, client, auth_headers, test_roles):
+        """Test creating a project from a template creates ghost staff per template role"""
+        role_ids = test_roles['role_ids']
+        template_data = {
+            'name': 'Route Test Template',
+            'duration_months': 6,
+            'roles': [
+                {'role_id': role_ids[0], 'count': 2, 'start_month': 1},
+                {'role_id': role_ids[1], 'count': 1, 'start_month': 2, 'end_month': 4}
+            ]
+        }
+        response = client.post('/api/templates', json=template_data, headers=auth_headers)
+        assert response.status_code == 201
+        template_id = response.get_json()['id']
+
+        response = client.post('/api/projects/from-template', json={
+            'template_id': template_id,
+            'name': 'Templated Project',
+            'start_date': '2025-01-01'
+        }, headers=auth_headers)
+        assert response.status_code == 201
+
+        data = response.get_json()
+        assert data['project']['end_date'] == '2025-07-01'
+        assert len(data['ghost_staff']) == 3
+        assert sorted(g['role_id'] for g in data['ghost_staff']) == sorted([role_ids[0], role_ids[0], role_ids[1]])
+
+    def test_replace_ghost_staff(self, client, auth_headers, test_data):
+        """Test replacing ghost staff creates an assignment with the ghost's role"""
+        role_ids = test_data['role_ids']
+        response = client.post('/api/templates', json={
+            'name': 'Replacement Template',
+            'duration_months': 2,
+            'roles': [{'role_id': role_ids[0], 'count': 1, 'start_month': 1}]
+        }, headers=auth_headers)
+        template_id = response.get_json()['id']
+
+        response = client.post('/api/projects/from-template', json={
+            'template_id': template_id,
+            'name': 'Replacement Project',
+            'start_date': '2025-01-01'
+        }, headers=auth_headers)
+        ghost = response.get_json()['ghost_staff'][0]
+
+        response = client.put(f"/api/ghost-staff/{ghost['id']}/replace",
+                              json={'staff_id': test_data['staff_ids'][0]}, headers=auth_headers)
+        assert response.status_code == 200
+
+        data = response.get_json()
+        assert data['ghost_staff']['is_replaced'] == True
+        assert data['assignment']['role_on_project'] == ghost['role_name']
+        assert data['assignment']['project_name'] == 'Replacement Project'
+
+        response = client.put(f"/api/ghost-staff/{ghost['id']}/replace",
+                              json={'staff_id': test_data['staff_ids'][0]}, headers=auth_headers)
+        assert response.status_code == 409
+
+    def test_get_templates_includes_roles(self, client, auth_headers, test_roles):
+        """Test listing templates includes each template's roles with role details"""
+        role_ids = test_roles['role_ids']
+        response = client.post('/api/templates', json={
+            'name': 'Listed Template',
+            'duration_months': 3,
+            'roles': [{'role_id': role_ids[0], 'count': 1, 'start_month': 1}]
+        }, headers=auth_headers)
+        assert response.status_code == 201
+
+        response = client.get('/api/templates', headers=auth_headers)
+        assert response.status_code == 200
+
+        template = next(t for t in response.get_json() if t['name'] == 'Listed Template')
+        assert template['role_count'] == 1
+        assert template['roles'][0]['role_id'] == role_ids[0]
+        assert template['roles'][0]['role_name'] is not None
+
+
+class TestReportEndpoints:
+    """Test reporting endpoints"""
+
+    def test_staff_planning_report_streamed(self, client, auth_headers, test_data):
+        """Test the streamed staff planning report matches the buffered one"""
+        url = f"/api/reports/staff-planning?project_id={test_data['project_ids'][0]}"
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        report = response.get_json()
+        assert len(report['staff_entries']) == 1
+
+        streamed = client.get(f'{url}&stream=true', headers=auth_headers)
+        assert streamed.status_code == 200
+        assert streamed.mimetype == 'application/json'
+        assert json.loads(streamed.get_data(as_text=True)) == report
+
+
 class TestStaffAvailabilityEndpoints:
     """Test staff availability forecast endpoints"""
 
@@ -843,6 +1503,22 @@ class TestOverAllocationEndpoints:
         data = response.get_json()
         assert 'has_conflicts' in data or 'timeline' in data
 
+    def test_staff_allocation_timeline_iso_dates(self, client, auth_headers, test_data):
+        """Test the allocation timeline encodes its dates as ISO strings"""
+        with client.application.app_context():
+            staff_id = Staff.query.first().id
+
+        response = client.get(
+            f'/api/staff/{staff_id}/allocation-timeline?start_date=2024-01-01&end_date=2024-03-31',
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        data = response.get_json()
+        assert data['period'] == {'start_date': '2024-01-01', 'end_date': '2024-03-31'}
+        assert sorted(data['monthly_allocations']) == ['2024-01', '2024-02', '2024-03']
+        assert all(key == entry['month'] for key, entry in data['monthly_allocations'].items())
+
     def test_validate_assignment_allocation(self, client, auth_headers, test_data):
         """Test validating an assignment for over-allocation"""
         with client.application.app_context():